@@ -0,0 +1,5 @@
+"""
+官家婆性能基准测试
+
+generator 生成可复现的模拟数据，runner 在不同数据规模下测量 DatabaseManager 各方法的耗时。
+"""
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+性能回归检查
+
+读取已提交的基准结果（benchmarks/baseline.json），按相同规模、种子和重复次数重新运行
+基准测试（包括无界面的总览页面加载），任一场景变慢超过容差时列出差异并以非零状态退出。
+
+用法：
+    python -m benchmarks.compare                       # 与基准结果比较
+    python -m benchmarks.compare --tolerance 0.5       # 允许慢50%
+    python -m benchmarks.compare --current results.json  # 比较已有结果，不重新运行
+    python -m benchmarks.compare --normalize           # 基准来自其他机器时按校准耗时换算
+    python -m benchmarks.compare --update              # 重新运行并更新基准结果
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from benchmarks.runner import run_benchmarks
+
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+
+# 默认容差：比基准慢 30% 以上视为回归
+DEFAULT_TOLERANCE = 0.3
+# 绝对差值低于该值（毫秒）时视为测量噪声，不判为回归
+DEFAULT_MIN_DELTA_MS = 2.0
+
+def calibration_factor(baseline: Dict, current: Dict) -> float:
+    """本次与基准的校准耗时之比，任一方缺少校准耗时时为 1"""
+    baseline_calibration = baseline['meta'].get('calibration_ms')
+    current_calibration = current['meta'].get('calibration_ms')
+    if baseline_calibration and current_calibration:
+        return current_calibration / baseline_calibration
+    return 1.0
+
+def compare_results(baseline: Dict, current: Dict, metric: str = 'median_ms',
+                    tolerance: float = DEFAULT_TOLERANCE,
+                    min_delta_ms: float = DEFAULT_MIN_DELTA_MS, normalize: bool = False) -> List[Dict]:
+    """逐个场景比较两次结果，返回差异列表
+
+    normalize 为 True 且两次结果都有校准耗时（meta.calibration_ms）时，
+    先按校准耗时之比换算基准值，抵消机器速度和负载的差异。
+
+    每项包含 scale、scenario、baseline、current、change（相对变化）和 status：
+    regression（变慢超过容差）、improved（变快超过容差）、ok、
+    missing（本次没有结果或执行失败）、new（基准中没有）、
+    error（基准中执行失败，该场景无法检查，需在完整环境中用 --update 重新生成）。
+    """
+    factor = calibration_factor(baseline, current) if normalize else 1.0
+    rows = []
+    for scale, baseline_scale in baseline['scales'].items():
+        baseline_results = baseline_scale['results']
+        current_results = current['scales'].get(scale, {}).get('results', {})
+
+        for scenario, base in baseline_results.items():
+            now = current_results.get(scenario)
+            expected = base[metric] * factor if metric in base else None
+            row = {'scale': scale, 'scenario': scenario, 'baseline': expected,
+                   'current': now.get(metric) if now else None, 'change': None}
+            if metric not in base:
+                row['status'] = 'error'
+            elif not now or metric not in now:
+                row['status'] = 'missing'
+            else:
+                delta = now[metric] - expected
+                row['change'] = delta / expected if expected else None
+                if delta > expected * tolerance and delta > min_delta_ms:
+                    row['status'] = 'regression'
+                elif -delta > expected * tolerance and -delta > min_delta_ms:
+                    row['status'] = 'improved'
+                else:
+                    row['status'] = 'ok'
+            rows.append(row)
+
+        for scenario, now in current_results.items():
+            if scenario not in baseline_results:
+                rows.append({'scale': scale, 'scenario': scenario, 'baseline': None,
+                             'current': now.get(metric), 'change': None, 'status': 'new'})
+    return rows
+
+STATUS_LABELS = {
+    'regression': '❌ 变慢',
+    'improved': '🚀 变快',
+    'ok': '✅',
+    'missing': '⚠️  缺失',
+    'new': '🆕 新增',
+    'error': '❌ 基准无效',
+}
+
+def format_report(rows: List[Dict], metric: str, tolerance: float, factor: float = 1.0,
+                  verbose: bool = False) -> str:
+    """生成可读的差异表，默认只列出需要关注的场景"""
+    def ms(value: Optional[float]) -> str:
+        return f"{value:.2f}" if value is not None else '-'
+
+    lines = [f"指标: {metric}，容差: {tolerance:.0%}，基准换算系数: {factor:.2f}",
+             f"{'规模':<8}{'场景':<46}{'基准(ms)':>12}{'本次(ms)':>12}{'变化':>10}  状态"]
+    for row in rows:
+        if not verbose and row['status'] == 'ok':
+            continue
+        change = f"{row['change']:+.1%}" if row['change'] is not None else '-'
+        lines.append(f"{row['scale']:<10}{row['scenario']:<48}{ms(row['baseline']):>12}"
+                     f"{ms(row['current']):>12}{change:>10}  {STATUS_LABELS[row['status']]}")
+
+    counts = {status: sum(1 for row in rows if row['status'] == status) for status in STATUS_LABELS}
+    lines.append('合计: ' + '，'.join(f"{STATUS_LABELS[status].split()[-1]} {count}"
+                                      for status, count in counts.items() if count))
+    return '\n'.join(lines)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='性能回归检查')
+    parser.add_argument('--baseline', default=str(BASELINE_PATH), help='基准结果文件')
+    parser.add_argument('--current', help='已有的本次结果文件，不指定时重新运行基准测试')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='允许的相对变慢比例，如 0.3 表示 30%%')
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                        help='低于该绝对差值（毫秒）的变化视为噪声')
+    parser.add_argument('--metric', default='median_ms', choices=['min_ms', 'median_ms', 'mean_ms'],
+                        help='比较的指标')
+    parser.add_argument('--normalize', action='store_true',
+                        help='按校准耗时换算基准值（与其他机器生成的基准比较时使用）')
+    parser.add_argument('--output', help='本次结果写入的文件')
+    parser.add_argument('--update', action='store_true', help='用本次结果更新基准结果')
+    parser.add_argument('--verbose', action='store_true', help='列出所有场景')
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """主函数：存在回归时返回 1"""
+    args = parse_args(argv)
+    baseline_path = Path(args.baseline)
+    baseline = None
+    if baseline_path.exists():
+        with open(baseline_path, encoding='utf-8') as f:
+            baseline = json.load(f)
+    elif not args.update:
+        print(f"基准结果不存在: {baseline_path}，请先使用 --update 生成")
+        return 1
+
+    if args.current:
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    else:
+        meta = baseline['meta'] if baseline else {}
+        scales = list(baseline['scales']) if baseline else ['tiny', 'small']
+        current = run_benchmarks(scales, meta.get('repeat', 5), meta.get('seed', 42))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+
+    if args.update:
+        # 执行失败的场景写入基准后将无法检查，应在完整环境中生成
+        failed = [f"{scale}/{scenario}: {result['error']}"
+                  for scale, scale_results in current['scales'].items()
+                  for scenario, result in scale_results['results'].items() if 'error' in result]
+        if failed:
+            print("❌ 以下场景执行失败，未更新基准结果:\n    " + '\n    '.join(failed))
+            return 1
+        with open(baseline_path, 'w', encoding='utf-8') as f:
+            json.dump(current, f, ensure_ascii=False, indent=2)
+        print(f"✅ 基准结果已更新: {baseline_path}")
+        return 0
+
+    normalize = args.normalize
+    rows = compare_results(baseline, current, args.metric, args.tolerance, args.min_delta_ms, normalize)
+    factor = calibration_factor(baseline, current) if normalize else 1.0
+    print(format_report(rows, args.metric, args.tolerance, factor, args.verbose))
+
+    regressions = [row for row in rows if row['status'] in ('regression', 'missing', 'error')]
+    if regressions:
+        print(f"❌ {len(regressions)} 个场景性能回归、缺失或基准无效")
+        return 1
+    print("✅ 没有发现性能回归")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+模拟数据生成器
+
+按固定随机种子生成账目、物品和库存变动，相同参数每次生成的数据完全一致。
+日期和分类的分布接近真实家庭账本：支出以餐饮、购物、交通为主，周末消费更多，
+工资按月发放，记账频率逐年上升；少数常用物品占大部分库存变动。
+数据通过批量接口在单个事务中写入，生成过程中内存占用固定。
+"""
+
+import math
+import random
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# 每次调用批量接口写入的行数
+CHUNK_SIZE = 50000
+
+# 账目分类：名称 -> (出现权重, 金额中位数, 金额离散度)
+ACCOUNT_PROFILES = {
+    '工资': (3, 9000, 0.1),
+    '奖金': (1, 3000, 0.6),
+    '投资收益': (2, 300, 1.0),
+    '其他收入': (1, 200, 0.8),
+    '餐饮': (40, 35, 0.7),
+    '购物': (18, 150, 1.0),
+    '交通': (15, 12, 0.6),
+    '居住': (3, 2500, 0.4),
+    '医疗': (3, 200, 1.0),
+    '教育': (3, 500, 0.9),
+    '娱乐': (8, 80, 0.8),
+    '其他支出': (5, 50, 1.0),
+}
+
+# 周末更常见的消费分类
+WEEKEND_CATEGORIES = {'餐饮', '购物', '娱乐'}
+
+DESCRIPTIONS = {
+    '工资': ['月工资', '工资发放'],
+    '奖金': ['季度奖金', '年终奖', '项目奖金'],
+    '投资收益': ['基金分红', '理财收益', '股票分红'],
+    '其他收入': ['二手转让', '红包', '退款'],
+    '餐饮': ['早餐', '午餐', '晚餐', '外卖', '咖啡', '水果', '超市零食', '聚餐'],
+    '购物': ['日用品采购', '衣服', '鞋子', '网购', '家电', '数码配件'],
+    '交通': ['地铁', '公交', '打车', '加油', '停车费', '高铁票'],
+    '居住': ['房租', '物业费', '水电费', '燃气费', '宽带'],
+    '医疗': ['挂号费', '药品', '体检'],
+    '教育': ['培训课程', '书籍', '学费'],
+    '娱乐': ['电影票', '游戏充值', '演唱会', '旅游'],
+    '其他支出': ['礼金', '快递费', '维修费'],
+}
+
+ITEM_NAMES = {
+    '食品饮料': ['大米', '食用油', '酱油', '牛奶', '矿泉水', '咖啡豆', '面粉', '鸡蛋'],
+    '日用品': ['洗衣液', '牙膏', '纸巾', '洗发水', '垃圾袋', '电池'],
+    '服装鞋帽': ['袜子', 'T恤', '运动鞋', '帽子'],
+    '电子产品': ['数据线', '充电器', '鼠标', '耳机'],
+    '家居用品': ['灯泡', '毛巾', '衣架', '收纳盒'],
+    '学习用品': ['笔记本', '中性笔', '打印纸'],
+    '其他': ['胶带', '雨伞', '工具箱'],
+}
+
+UNITS = ['个', '瓶', '包', '袋', '盒', '件']
+
+class DataGenerator:
+    """可复现的模拟数据生成器"""
+
+    def __init__(self, db_manager, seed: int = 42, end_date: str = '2024-12-31', years: int = 5):
+        self.db = db_manager
+        self.seed = seed
+        self.end_date = date.fromisoformat(end_date)
+        self.start_date = self.end_date.replace(year=self.end_date.year - years) + timedelta(days=1)
+
+        # 每天的记账权重：逐年上升，周末多一些
+        self.days: List[date] = []
+        self.day_weights: List[float] = []
+        total_days = (self.end_date - self.start_date).days + 1
+        cumulative = 0.0
+        for offset in range(total_days):
+            day = self.start_date + timedelta(days=offset)
+            cumulative += (1 + offset / total_days) * (1.3 if day.weekday() >= 5 else 1.0)
+            self.days.append(day)
+            self.day_weights.append(cumulative)
+
+    def _random_day(self, rng: random.Random) -> date:
+        return rng.choices(self.days, cum_weights=self.day_weights)[0]
+
+    def generate(self, accounts: int, items: int, transactions: int,
+                 progress: Optional[Callable[[str, int, int], None]] = None) -> Dict[str, int]:
+        """生成指定数量的数据，progress(阶段, 已完成, 总数) 在每批写入后调用"""
+        inserted = {}
+        with self.db.bulk_import_mode(), self.db.transaction():
+            inserted['accounts'] = self._write_chunks(
+                'accounts', self.iter_accounts(accounts), accounts,
+                self.db.add_accounts_bulk, progress)
+            inserted['items'] = self._write_chunks(
+                'items', self.iter_items(items), items, self._add_items, progress)
+            inserted['inventory_transactions'] = self._write_chunks(
+                'inventory_transactions', self.iter_inventory_transactions(transactions), transactions,
+                self.db.add_inventory_transactions_bulk, progress)
+        return inserted
+
+    @staticmethod
+    def _write_chunks(stage: str, rows: Iterator[Tuple], total: int, write,
+                      progress: Optional[Callable[[str, int, int], None]]) -> int:
+        """按 CHUNK_SIZE 分批写入，每次只在内存中保留一批"""
+        written = 0
+        while written < total:
+            chunk = [row for _, row in zip(range(CHUNK_SIZE), rows)]
+            if not chunk:
+                break
+            written += write(chunk)
+            if progress:
+                progress(stage, written, total)
+        return written
+
+    def iter_accounts(self, count: int) -> Iterator[Tuple]:
+        """逐行生成账目 (type, amount, category_id, description, date)"""
+        rng = random.Random(self.seed)
+        categories = [category for category in self.db.get_categories()
+                      if category['name'] in ACCOUNT_PROFILES]
+        weights = [ACCOUNT_PROFILES[category['name']][0] for category in categories]
+
+        for _ in range(count):
+            category = rng.choices(categories, weights=weights)[0]
+            name = category['name']
+            _, median, sigma = ACCOUNT_PROFILES[name]
+
+            day = self._random_day(rng)
+            if name == '工资':
+                day = day.replace(day=10)
+            elif name in WEEKEND_CATEGORIES and day.weekday() < 5 and rng.random() < 0.2:
+                # 工作日的部分娱乐购物挪到当周周末
+                day = min(day + timedelta(days=5 - day.weekday()), self.end_date)
+
+            amount = round(median * math.exp(rng.gauss(0, sigma)), 2)
+            description = rng.choice(DESCRIPTIONS[name])
+            yield (category['type'], amount, category['id'], description, day.isoformat())
+
+    def iter_items(self, count: int) -> Iterator[Tuple]:
+        """逐行生成物品 (name, category_id, quantity, unit, unit_price, min_quantity, description)"""
+        rng = random.Random(self.seed + 1)
+        _, item_categories = self.db.category_maps()
+        choices = [(category_id, name) for category_id, name in sorted(item_categories.items())
+                   if name in ITEM_NAMES]
+
+        for index in range(count):
+            category_id, category_name = rng.choice(choices)
+            base_name = rng.choice(ITEM_NAMES[category_name])
+            min_quantity = rng.randint(0, 10)
+            # 约一成物品低于最低库存
+            quantity = rng.randint(0, max(min_quantity - 1, 0)) if rng.random() < 0.1 \
+                else rng.randint(min_quantity, min_quantity + 100)
+            yield (f"{base_name} {index + 1}", category_id, quantity, rng.choice(UNITS),
+                   round(math.exp(rng.gauss(3, 1)), 2), min_quantity,
+                   f"{category_name} {base_name}")
+
+    def _add_items(self, rows: List[Tuple]) -> int:
+        """批量写入物品（DatabaseManager 没有物品批量接口，在外层事务中逐条写入）"""
+        for row in rows:
+            self.db.add_item(*row)
+        return len(rows)
+
+    def iter_inventory_transactions(self, count: int) -> Iterator[Tuple]:
+        """逐行生成库存变动 (item_id, type, quantity, unit_price, reason, date)
+
+        物品被选中的概率按 Zipf 分布，少数常用物品占大部分变动。
+        """
+        rng = random.Random(self.seed + 2)
+        item_ids = [row['id'] for row in self.db.execute_query("SELECT id FROM items ORDER BY id")]
+        if not item_ids:
+            return
+        rng.shuffle(item_ids)
+        cumulative = 0.0
+        item_weights = []
+        for rank in range(len(item_ids)):
+            cumulative += 1 / (rank + 1) ** 1.1
+            item_weights.append(cumulative)
+
+        for _ in range(count):
+            item_id = rng.choices(item_ids, cum_weights=item_weights)[0]
+            if rng.random() < 0.4:
+                yield (item_id, 'in', rng.randint(1, 20), round(math.exp(rng.gauss(3, 1)), 2),
+                       '采购入库', self._random_day(rng).isoformat())
+            else:
+                yield (item_id, 'out', rng.randint(1, 5), 0, '日常使用',
+                       self._random_day(rng).isoformat())
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+DatabaseManager 性能基准测试
+
+在临时数据库中按不同规模生成模拟数据，逐个测量 DatabaseManager 公共方法的耗时，
+结果写入JSON文件。每次测量前清空查询缓存，测得的是未命中缓存时的耗时。
+
+用法：
+    python -m benchmarks.runner --scales small,medium --output benchmark_results.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config import DB_CONFIG
+from src.database.database import DatabaseManager
+from benchmarks.generator import DataGenerator
+
+# 数据规模：名称 -> (账目数, 物品数, 库存变动数)
+SCALES = {
+    'tiny': (1000, 100, 5000),
+    'small': (10000, 1000, 50000),
+    'medium': (100000, 10000, 500000),
+    'large': (1000000, 100000, 5000000),
+}
+
+# 连接、事务等基础设施方法，不单独计时
+INFRASTRUCTURE_METHODS = {
+    'connect', 'initialize_database', 'close', 'bulk_import_mode', 'transaction',
+    'in_transaction', 'enable_write_behind', 'disable_write_behind', 'flush',
+}
+
+def _context(db: DatabaseManager, generator: DataGenerator) -> Dict:
+    """测试用的常用参数：最近一个月、最近一年、任一分类和物品等"""
+    end = generator.end_date
+    expense = db.get_categories('expense')
+    item = db.execute_query("SELECT id FROM items ORDER BY id LIMIT 1")
+    return {
+        'month_start': end.replace(day=1).isoformat(),
+        'year_start': end.replace(month=1, day=1).isoformat(),
+        'end': end.isoformat(),
+        'start_month': end.replace(month=1).strftime('%Y-%m'),
+        'end_month': end.strftime('%Y-%m'),
+        'category_id': expense[0]['id'],
+        'item_id': item[0]['id'] if item else None,
+    }
+
+class _RowCount(int):
+    """逐行读取或翻页场景返回的行数，与新增方法返回的 id 区分"""
+
+def _first_pages(get_page, pages: int) -> Callable:
+    """连续翻 pages 页"""
+    def run():
+        cursor = None
+        rows = 0
+        for _ in range(pages):
+            page, cursor = get_page(cursor)
+            rows += len(page)
+            if cursor is None:
+                break
+        return _RowCount(rows)
+    return run
+
+def _count(iterator) -> int:
+    return _RowCount(sum(1 for _ in iterator))
+
+def _scenarios(ctx: Dict) -> List[Tuple[str, str, Callable]]:
+    """测试场景：(名称, 被测方法, 准备函数)
+
+    准备函数接收 DatabaseManager，返回要计时的无参函数，准备工作本身不计时。
+    """
+    month = {'start_date': ctx['month_start'], 'end_date': ctx['end']}
+    year = {'start_date': ctx['year_start'], 'end_date': ctx['end']}
+    account = ('expense', 25.5, ctx['category_id'], '基准测试', ctx['end'])
+    item = ('基准测试物品', None, 10, '个', 5.0, 1, '基准测试')
+
+    def add_then(add, action):
+        def prepare(db):
+            row_id = add(db)
+            return lambda: action(db, row_id)
+        return prepare
+
+    return [
+        ('execute_query', 'execute_query',
+         lambda db: lambda: db.execute_query("SELECT COUNT(*) FROM accounts")),
+        ('execute_insert', 'execute_insert',
+         lambda db: lambda: db.execute_insert(
+             "INSERT INTO settings (key, value) VALUES (?, ?)", (f"benchmark_{time.perf_counter_ns()}", '1'))),
+        ('execute_update', 'execute_update',
+         lambda db: lambda: db.execute_update("UPDATE settings SET value = value WHERE key = ?", ('none',))),
+        ('iter_query', 'iter_query',
+         lambda db: lambda: _count(db.iter_query("SELECT id FROM accounts"))),
+        ('get_categories', 'get_categories', lambda db: lambda: db.get_categories()),
+        ('category_maps', 'category_maps', lambda db: lambda: db.category_maps()),
+        ('add_category', 'add_category',
+         lambda db: lambda: db.add_category(f"基准{time.perf_counter_ns()}", 'expense')),
+        ('update_category', 'update_category',
+         add_then(lambda db: db.add_category(f"基准{time.perf_counter_ns()}", 'expense'),
+                  lambda db, row_id: db.update_category(row_id, f"基准{row_id}", '#000000'))),
+        ('delete_category', 'delete_category',
+         add_then(lambda db: db.add_category(f"基准{time.perf_counter_ns()}", 'expense'),
+                  lambda db, row_id: db.delete_category(row_id))),
+        ('get_accounts[month]', 'get_accounts', lambda db: lambda: db.get_accounts(month)),
+        # 不足三个字的关键字按 LIKE 扫描，三个字及以上走全文索引（accounts_fts）
+        ('get_accounts[keyword]', 'get_accounts',
+         lambda db: lambda: db.get_accounts(dict(year, keyword='午餐'))),
+        ('get_accounts[keyword fts]', 'get_accounts',
+         lambda db: lambda: db.get_accounts(dict(year, keyword='超市零食'))),
+        ('get_accounts[all]', 'get_accounts', lambda db: lambda: db.get_accounts()),
+        ('iter_accounts[all]', 'iter_accounts', lambda db: lambda: _count(db.iter_accounts())),
+        ('get_accounts_columns[year]', 'get_accounts_columns',
+         lambda db: lambda: db.get_accounts_columns(year)),
+        ('get_accounts_page[10 pages]', 'get_accounts_page',
+         lambda db: _first_pages(lambda cursor: db.get_accounts_page(cursor=cursor), 10)),
+        ('search_accounts', 'search_accounts', lambda db: lambda: db.search_accounts('外卖')),
+        ('search_accounts[fts]', 'search_accounts', lambda db: lambda: db.search_accounts('超市零食')),
+        ('find_account_fingerprints[1000]', 'find_account_fingerprints',
+         lambda db: lambda: db.find_account_fingerprints(f"{i:032x}" for i in range(1000))),
+        ('add_account', 'add_account', lambda db: lambda: db.add_account(*account)),
+        ('add_accounts_bulk[1000]', 'add_accounts_bulk',
+         lambda db: lambda: db.add_accounts_bulk([account] * 1000)),
+        ('update_account', 'update_account',
+         add_then(lambda db: db.add_account(*account),
+                  lambda db, row_id: db.update_account(row_id, {'amount': 30}))),
+        ('delete_account', 'delete_account',
+         add_then(lambda db: db.add_account(*account),
+                  lambda db, row_id: db.delete_account(row_id))),
+        ('get_account_summary[month]', 'get_account_summary',
+         lambda db: lambda: db.get_account_summary(ctx['month_start'], ctx['end'])),
+        ('get_account_summary[year]', 'get_account_summary',
+         lambda db: lambda: db.get_account_summary(ctx['year_start'], ctx['end'])),
+        ('get_category_summary[month]', 'get_category_summary',
+         lambda db: lambda: db.get_category_summary(ctx['month_start'], ctx['end'])),
+        ('get_category_summary[year]', 'get_category_summary',
+         lambda db: lambda: db.get_category_summary(ctx['year_start'], ctx['end'])),
+        ('get_monthly_summary[year]', 'get_monthly_summary',
+         lambda db: lambda: db.get_monthly_summary(ctx['start_month'], ctx['end_month'])),
+        ('get_items[all]', 'get_items', lambda db: lambda: db.get_items()),
+        ('get_items[low_stock]', 'get_items', lambda db: lambda: db.get_items({'low_stock': True})),
+        ('iter_items[all]', 'iter_items', lambda db: lambda: _count(db.iter_items())),
+        ('search_items', 'search_items', lambda db: lambda: db.search_items('洗')),
+        ('add_item', 'add_item', lambda db: lambda: db.add_item(*item)),
+        ('update_item', 'update_item',
+         add_then(lambda db: db.add_item(*item),
+                  lambda db, row_id: db.update_item(row_id, {'quantity': 20}))),
+        ('delete_item', 'delete_item',
+         add_then(lambda db: db.add_item(*item), lambda db, row_id: db.delete_item(row_id))),
+        ('add_inventory_transaction', 'add_inventory_transaction',
+         lambda db: lambda: db.add_inventory_transaction(
+             ctx['item_id'], 'in', 1, 5.0, '基准测试', ctx['end'])),
+        ('add_inventory_transactions_bulk[1000]', 'add_inventory_transactions_bulk',
+         lambda db: lambda: db.add_inventory_transactions_bulk(
+             [(ctx['item_id'], 'in', 1, 5.0, '基准测试', ctx['end'])] * 1000)),
+        ('get_inventory_transactions[month]', 'get_inventory_transactions',
+         lambda db: lambda: db.get_inventory_transactions(month)),
+        ('get_inventory_transactions[item]', 'get_inventory_transactions',
+         lambda db: lambda: db.get_inventory_transactions({'item_id': ctx['item_id']})),
+        ('iter_inventory_transactions[all]', 'iter_inventory_transactions',
+         lambda db: lambda: _count(db.iter_inventory_transactions())),
+        ('get_inventory_transactions_page[10 pages]', 'get_inventory_transactions_page',
+         lambda db: _first_pages(lambda cursor: db.get_inventory_transactions_page(cursor=cursor), 10)),
+        ('dashboard_load', None, _dashboard_load),
+    ]
+
+def _dashboard_load(db: DatabaseManager) -> Callable:
+    """无界面模式下打开总览页面，直到后台查询完成并更新界面"""
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt6.QtCore import QThreadPool
+    from PyQt6.QtWidgets import QApplication
+    from src.ui.dashboard import DashboardWidget
+
+    app = QApplication.instance() or QApplication([])
+
+    def run():
+        widget = DashboardWidget(db)
+        QThreadPool.globalInstance().waitForDone()
+        app.processEvents()
+        widget.cleanup()
+        widget.deleteLater()
+    return run
+
+def uncovered_methods(scenarios: List[Tuple[str, str, Callable]]) -> List[str]:
+    """没有测试场景的公共方法，新增方法后应补充场景"""
+    public = {name for name in dir(DatabaseManager)
+              if not name.startswith('_') and callable(getattr(DatabaseManager, name))}
+    covered = {method for _, method, _ in scenarios}
+    return sorted(public - covered - INFRASTRUCTURE_METHODS)
+
+def _rows(result) -> Optional[int]:
+    """结果的行数（列表、翻页行数或NumPy列），无法计算时返回 None"""
+    if isinstance(result, _RowCount):
+        return int(result)
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, dict) and 'id' in result:
+        return len(result['id'])
+    return None
+
+def measure(db: DatabaseManager, prepare: Callable, repeat: int) -> Dict:
+    """执行 repeat 次并统计耗时（毫秒）"""
+    # 预热一次，不计入结果
+    prepare(db)()
+
+    timings = []
+    rows = None
+    for _ in range(repeat):
+        func = prepare(db)
+        db.cache.invalidate()
+        # 与 timeit 相同，计时期间关闭垃圾回收，避免回收停顿造成的波动
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            gc.enable()
+        rows = _rows(result)
+
+    return {
+        'repeat': repeat,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'max_ms': round(max(timings), 3),
+        'rows': rows,
+    }
+
+def calibrate(repeat: int = 10) -> float:
+    """在内存数据库中执行固定的工作量，返回最短耗时（毫秒）
+
+    用于比较不同机器或不同负载下的结果：两次运行的校准耗时之比近似于机器速度之比。
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        connection = sqlite3.connect(':memory:')
+        connection.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, k INTEGER, v TEXT)")
+        connection.executemany("INSERT INTO t (k, v) VALUES (?, ?)",
+                               ((i % 997, f"值{i}") for i in range(50000)))
+        connection.execute("CREATE INDEX idx_t_k ON t (k)")
+        for k in range(0, 997, 7):
+            [dict(zip(('id', 'k', 'v'), row)) for row in
+             connection.execute("SELECT id, k, v FROM t WHERE k = ? ORDER BY id", (k,))]
+        connection.close()
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(min(timings), 3)
+
+def open_database(path: str) -> DatabaseManager:
+    """在指定路径打开独立的测试数据库，不影响用户数据"""
+    DB_CONFIG['database_path'] = path
+    DB_CONFIG['slow_query_ms'] = None
+    return DatabaseManager()
+
+def run_scale(name: str, counts: Tuple[int, int, int], repeat: int, seed: int,
+              only: Optional[List[str]] = None) -> Dict:
+    """在一个新的临时数据库中生成数据并运行全部场景"""
+    accounts, items, transactions = counts
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db = open_database(os.path.join(temp_dir, 'benchmark.db'))
+        try:
+            generator = DataGenerator(db, seed=seed)
+            print(f"📦 [{name}] 生成数据: 账目 {accounts}，物品 {items}，库存变动 {transactions}")
+            start = time.perf_counter()
+            generator.generate(accounts, items, transactions,
+                               progress=lambda stage, done, total: print(
+                                   f"    {stage}: {done}/{total}", end='\r'))
+            generate_s = time.perf_counter() - start
+            print(f"    生成完成，耗时 {generate_s:.1f} 秒" + ' ' * 20)
+
+            ctx = _context(db, generator)
+            results = {}
+            for label, _, prepare in _scenarios(ctx):
+                if only and not any(pattern in label for pattern in only):
+                    continue
+                try:
+                    results[label] = measure(db, prepare, repeat)
+                except Exception as e:
+                    # 例如未安装NumPy时 get_accounts_columns 不可用
+                    results[label] = {'error': str(e)}
+                    print(f"    {label:<45} 失败: {e}")
+                    continue
+                print(f"    {label:<45} {results[label]['median_ms']:>10.2f} ms")
+
+            return {
+                'accounts': accounts,
+                'items': items,
+                'inventory_transactions': transactions,
+                'generate_s': round(generate_s, 3),
+                'db_size': os.path.getsize(db.db_path),
+                'results': results,
+            }
+        finally:
+            db.close()
+
+def run_benchmarks(scales: List[str], repeat: int = 5, seed: int = 42,
+                   only: Optional[List[str]] = None) -> Dict:
+    """运行指定规模的基准测试，返回可写入JSON的结果"""
+    missing = uncovered_methods(_scenarios(defaultdict(str)))
+    if missing:
+        print(f"⚠️  以下方法没有测试场景: {', '.join(missing)}")
+
+    original_config = dict(DB_CONFIG)
+    try:
+        results = {name: run_scale(name, SCALES[name], repeat, seed, only) for name in scales}
+    finally:
+        DB_CONFIG.clear()
+        DB_CONFIG.update(original_config)
+
+    return {
+        'meta': {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'seed': seed,
+            'repeat': repeat,
+            'calibration_ms': calibrate(),
+        },
+        'scales': results,
+    }
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='DatabaseManager 性能基准测试')
+    parser.add_argument('--scales', default='tiny,small',
+                        help=f"数据规模，逗号分隔，可选: {', '.join(SCALES)}")
+    parser.add_argument('--repeat', type=int, default=5, help='每个场景的重复次数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--only', help='只运行名称包含这些关键字的场景，逗号分隔')
+    parser.add_argument('--output', default='benchmark_results.json', help='结果文件路径')
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """主函数"""
+    args = parse_args(argv)
+    scales = [name.strip() for name in args.scales.split(',') if name.strip()]
+    unknown = [name for name in scales if name not in SCALES]
+    if unknown:
+        print(f"未知的数据规模: {', '.join(unknown)}")
+        return 1
+
+    only = [pattern.strip() for pattern in args.only.split(',')] if args.only else None
+    results = run_benchmarks(scales, args.repeat, args.seed, only)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"✅ 结果已写入 {args.output}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
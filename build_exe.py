@@ -60,6 +60,7 @@ def build_executable():
         '--hidden-import=PyQt6.QtWidgets',
         '--hidden-import=matplotlib.backends.backend_qt5agg',
         '--hidden-import=PIL._tkinter_finder',
+        '--hidden-import=xlsxwriter',
         '--exclude-module=matplotlib.backends.backend_tkagg',
         '--exclude-module=tkinter',
         '--distpath=dist',
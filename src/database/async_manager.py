@@ -0,0 +1,127 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from .database import DatabaseManager
+
+# 在只读线程池中执行的方法
+READ_METHODS = (
+    'execute_query',
+    'get_categories',
+    'category_maps',
+    'get_accounts',
+    'get_accounts_page',
+    'get_accounts_columns',
+    'search_accounts',
+    'find_account_fingerprints',
+    'get_account_summary',
+    'get_category_summary',
+    'get_monthly_summary',
+    'get_items',
+    'search_items',
+    'get_inventory_transactions',
+    'get_inventory_transactions_page',
+)
+
+# 在专用写线程中按提交顺序执行的方法
+WRITE_METHODS = (
+    'execute_update',
+    'execute_insert',
+    'add_category',
+    'update_category',
+    'delete_category',
+    'add_account',
+    'add_accounts_bulk',
+    'update_account',
+    'delete_account',
+    'add_item',
+    'update_item',
+    'delete_item',
+    'add_inventory_transaction',
+    'add_inventory_transactions_bulk',
+)
+
+class AsyncDatabaseManager:
+    """DatabaseManager 的 asyncio 封装
+
+    提供与 DatabaseManager 同名的协程方法。读操作在有界线程池中执行，
+    每个线程使用连接池分配的只读连接；写操作统一交给一个专用写线程，
+    按提交顺序串行执行。
+
+    取消正在执行的读操作时会中断其所在连接上的SQL语句；
+    写操作一旦开始就会执行完毕，取消只影响等待结果的协程。
+
+    用法：
+        async with AsyncDatabaseManager() as db:
+            accounts = await db.get_accounts({'limit': 10})
+            await db.add_account('expense', 12.5, category_id, '午餐', '2024-01-15')
+    """
+
+    def __init__(self, db_manager: Optional[DatabaseManager] = None, max_readers: int = 4):
+        self._owns_manager = db_manager is None
+        self.db = db_manager or DatabaseManager()
+        self._read_executor = ThreadPoolExecutor(max_workers=max_readers, thread_name_prefix='db-read')
+        self._write_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-write')
+
+    async def _run_read(self, name: str, *args, **kwargs):
+        """在只读线程池中执行查询，协程被取消时中断查询"""
+        method = getattr(self.db, name)
+        state = {'connection': None, 'done': False}
+        lock = threading.Lock()
+
+        def call():
+            with lock:
+                state['connection'] = self.db.pool.reader()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                with lock:
+                    state['done'] = True
+
+        future = asyncio.get_running_loop().run_in_executor(self._read_executor, call)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            with lock:
+                connection = state['connection']
+                # 写连接可能正被其他线程使用，不能中断
+                if (not state['done'] and connection is not None
+                        and connection is not self.db.pool.writer_connection):
+                    connection.interrupt()
+            raise
+
+    async def _run_write(self, name: str, *args, **kwargs):
+        """在专用写线程中执行写操作"""
+        method = functools.partial(getattr(self.db, name), *args, **kwargs)
+        future = asyncio.get_running_loop().run_in_executor(self._write_executor, method)
+        return await future
+
+    async def close(self):
+        """等待已提交的写操作完成后关闭线程池和数据库连接"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write_executor.shutdown, True)
+        await loop.run_in_executor(None, self._read_executor.shutdown, True)
+        if self._owns_manager:
+            self.db.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+def _make_coroutine(name: str, runner):
+    """生成与 DatabaseManager 方法同名的协程方法"""
+    async def method(self, *args, **kwargs):
+        return await runner(self, name, *args, **kwargs)
+
+    method.__name__ = name
+    method.__qualname__ = f"AsyncDatabaseManager.{name}"
+    method.__doc__ = getattr(DatabaseManager, name).__doc__
+    return method
+
+for _name in READ_METHODS:
+    setattr(AsyncDatabaseManager, _name, _make_coroutine(_name, AsyncDatabaseManager._run_read))
+for _name in WRITE_METHODS:
+    setattr(AsyncDatabaseManager, _name, _make_coroutine(_name, AsyncDatabaseManager._run_write))
@@ -0,0 +1,176 @@
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+from ..utils.config import DB_CONFIG
+from .connection import open_connection
+
+# 支持的压缩格式：名称 -> (扩展名, 打开函数)，均为流式读写
+COMPRESSORS = {
+    'gzip': ('.gz', gzip.open),
+    'bz2': ('.bz2', bz2.open),
+    'xz': ('.xz', lzma.open),
+}
+
+_CHUNK_SIZE = 1024 * 1024
+
+class BackupManager:
+    """数据库备份与恢复
+
+    使用 SQLite 在线备份接口按页分批复制数据库，复制期间不影响读写；
+    保留最近 backup_count 份备份，可选压缩，并可恢复到任意一份。
+    参数为 None 时使用 DB_CONFIG 中的设置，compression 传空字符串表示不压缩。
+    """
+
+    def __init__(self, db_manager, backup_dir: Optional[str] = None,
+                 backup_count: Optional[int] = None, compression: Optional[str] = None):
+        self.db = db_manager
+        self.backup_dir = Path(backup_dir or DB_CONFIG.get('backup_dir')
+                               or Path(db_manager.db_path).parent / 'backups')
+        self.backup_count = backup_count if backup_count is not None else DB_CONFIG.get('backup_count', 10)
+        self.compression = compression if compression is not None else DB_CONFIG.get('backup_compression')
+        if self.compression and self.compression not in COMPRESSORS:
+            raise ValueError(f"不支持的压缩格式: {self.compression}")
+
+    def create_backup(self, pages: Optional[int] = None,
+                      progress: Optional[Callable[[int, int], None]] = None) -> Optional[Path]:
+        """创建一份备份并轮换旧备份，返回备份文件路径，失败时返回 None
+
+        每次复制 pages 页，progress(剩余页数, 总页数) 在每一步后调用。
+        建议在后台线程中调用。
+        """
+        pages = pages or DB_CONFIG.get('backup_pages_per_step', 256)
+        self.backup_dir.mkdir(parents=True, exist_ok=True)
+
+        stem = f"{Path(self.db.db_path).stem}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+        target = self.backup_dir / f"{stem}.db"
+        partial = target.with_suffix('.db.partial')
+
+        try:
+            source = destination = None
+            try:
+                # 使用独立的连接作为备份源，不占用写连接
+                source = open_connection(self.db.db_path)
+                destination = sqlite3.connect(str(partial))
+                source.backup(destination, pages=pages,
+                              progress=(lambda status, remaining, total: progress(remaining, total))
+                              if progress else None)
+            finally:
+                for connection in (destination, source):
+                    if connection is not None:
+                        connection.close()
+
+            if self.compression:
+                extension, opener = COMPRESSORS[self.compression]
+                target = target.with_name(target.name + extension)
+                with open(partial, 'rb') as src, opener(str(target) + '.partial', 'wb') as dst:
+                    shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+                partial.unlink()
+                partial = Path(str(target) + '.partial')
+
+            os.replace(partial, target)
+        except Exception as e:
+            print(f"数据库备份失败: {e}")
+            if partial.exists():
+                partial.unlink()
+            return None
+
+        self.rotate()
+        return target
+
+    def list_backups(self) -> List[Dict]:
+        """列出现有备份，最新的在前（序号0）"""
+        if not self.backup_dir.exists():
+            return []
+
+        prefix = f"{Path(self.db.db_path).stem}_"
+        suffixes = ('.db',) + tuple('.db' + extension for extension, _ in COMPRESSORS.values())
+        backups = []
+        for path in self.backup_dir.iterdir():
+            if path.name.startswith(prefix) and path.name.endswith(suffixes):
+                stat = path.stat()
+                backups.append({
+                    'path': path,
+                    'size': stat.st_size,
+                    'created_at': datetime.fromtimestamp(stat.st_mtime),
+                })
+
+        # 文件名中的时间戳可以直接按字符串排序
+        backups.sort(key=lambda backup: backup['path'].name, reverse=True)
+        return backups
+
+    def is_due(self, interval_hours: Optional[float] = None) -> bool:
+        """距离最近一份备份是否已超过间隔（backup_interval_hours），间隔为0时不自动备份"""
+        if interval_hours is None:
+            interval_hours = DB_CONFIG.get('backup_interval_hours', 24)
+        if not interval_hours:
+            return False
+        backups = self.list_backups()
+        if not backups:
+            return True
+        return (datetime.now() - backups[0]['created_at']).total_seconds() >= interval_hours * 3600
+
+    def rotate(self) -> int:
+        """删除超出保留份数的旧备份，返回删除的份数"""
+        removed = 0
+        for backup in self.list_backups()[self.backup_count:]:
+            try:
+                backup['path'].unlink()
+                removed += 1
+            except OSError as e:
+                print(f"删除旧备份失败: {e}")
+        return removed
+
+    def restore_backup(self, generation: Union[int, str, Path] = 0,
+                       pages: Optional[int] = None) -> bool:
+        """从备份恢复数据库，generation 为备份序号（0为最新）或备份文件路径
+
+        通过备份接口写回当前数据库，已打开的连接无需重新连接。
+        """
+        if isinstance(generation, int):
+            backups = self.list_backups()
+            if generation >= len(backups):
+                print(f"备份不存在: {generation}")
+                return False
+            path = backups[generation]['path']
+        else:
+            path = Path(generation)
+
+        pages = pages or DB_CONFIG.get('backup_pages_per_step', 256)
+        temp_path = None
+        try:
+            opener = next((opener for extension, opener in COMPRESSORS.values()
+                           if path.name.endswith(extension)), None)
+            if opener:
+                # 先流式解压到临时文件
+                fd, temp_path = tempfile.mkstemp(suffix='.db', dir=str(self.backup_dir))
+                with os.fdopen(fd, 'wb') as dst, opener(str(path), 'rb') as src:
+                    shutil.copyfileobj(src, dst, _CHUNK_SIZE)
+                path = Path(temp_path)
+
+            source = sqlite3.connect(str(path))
+            try:
+                if source.execute("PRAGMA quick_check").fetchone()[0] != 'ok':
+                    print(f"备份文件已损坏: {path}")
+                    return False
+                with self.db.pool.writer() as connection:
+                    source.backup(connection, pages=pages)
+            finally:
+                source.close()
+        except Exception as e:
+            print(f"数据库恢复失败: {e}")
+            return False
+        finally:
+            if temp_path and os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+        # 备份可能来自旧版本，补齐迁移并清空缓存
+        self.db.initialize_database()
+        self.db.cache.invalidate()
+        return True
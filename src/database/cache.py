@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+class QueryCache:
+    """查询结果缓存
+
+    按最近最少使用（LRU）淘汰。每个表有一个版本号，写入时递增；
+    缓存项记录查询时依赖表的版本号，版本号变化后该缓存项即失效。
+    除条数外还限制缓存的总行数，超过 max_result_rows 行的结果不缓存，
+    以免大量物品或账目的完整列表占用过多内存（命中时还需复制整个结果）。
+    """
+
+    def __init__(self, max_entries: int = 128, max_rows: int = 50000,
+                 max_result_rows: int = 5000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.max_result_rows = max_result_rows
+        self._rows = 0  # 当前缓存的总行数
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[Hashable, Tuple[Tuple[int, ...], Any]]' = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0  # 清空全部缓存时递增
+        self._lock = threading.Lock()
+
+    def generations(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        """获取一组表当前的版本号"""
+        with self._lock:
+            return self._current(tables)
+
+    def _current(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        return (self._epoch,) + tuple(self._generations.get(table, 0) for table in tables)
+
+    def get(self, key: Hashable, tables: Iterable[str]) -> Tuple[bool, Any]:
+        """查找缓存，返回 (是否命中, 结果)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == self._current(tables):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return True, entry[1]
+                self._remove(key)
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, generations: Tuple[int, ...], value: Any):
+        """写入缓存，generations 应在执行查询之前获取，避免缓存查询期间被修改的结果"""
+        rows = self._size(value)
+        if self.max_entries <= 0 or rows > self.max_result_rows:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (generations, value)
+            self._rows += rows
+            while len(self._entries) > self.max_entries or self._rows > self.max_rows:
+                self._remove(next(iter(self._entries)))
+
+    @staticmethod
+    def _size(value: Any) -> int:
+        """缓存结果的行数，非列表结果按1行计"""
+        return len(value) if isinstance(value, (list, tuple)) else 1
+
+    def _remove(self, key: Hashable):
+        """删除缓存项（调用方持有 _lock）"""
+        _, value = self._entries.pop(key)
+        self._rows -= self._size(value)
+
+    def invalidate(self, tables: Optional[Iterable[str]] = None):
+        """递增表的版本号使相关缓存失效，tables 为 None 时清空全部缓存"""
+        with self._lock:
+            if tables is None:
+                self._epoch += 1
+                self._entries.clear()
+                self._rows = 0
+                return
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        """缓存统计信息"""
+        with self._lock:
+            return {'entries': len(self._entries), 'rows': self._rows,
+                    'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,26 @@
+import re
+import sqlite3
+from typing import Any, Dict, Optional
+
+_PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+_PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+def apply_pragmas(connection: sqlite3.Connection, pragmas: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """应用连接参数，返回修改前的取值，便于之后恢复"""
+    previous = {}
+    for name, value in (pragmas or {}).items():
+        if not _PRAGMA_NAME.match(name) or not _PRAGMA_VALUE.match(str(value)):
+            raise ValueError(f"无效的连接参数: {name}={value}")
+
+        row = connection.execute(f"PRAGMA {name}").fetchone()
+        previous[name] = row[0] if row else None
+        connection.execute(f"PRAGMA {name} = {value}")
+    return previous
+
+def open_connection(db_path: str, pragmas: Optional[Dict[str, Any]] = None,
+                    **kwargs) -> sqlite3.Connection:
+    """打开数据库连接并应用连接参数"""
+    connection = sqlite3.connect(db_path, **kwargs)
+    connection.row_factory = sqlite3.Row  # 使结果可以通过列名访问
+    apply_pragmas(connection, pragmas)
+    return connection
@@ -1,176 +1,318 @@
 import sqlite3
 import os
+import json
+import base64
+import calendar
+import math
+import re
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any
-from ..utils.config import DB_CONFIG, DEFAULT_CATEGORIES, DEFAULT_INVENTORY_CATEGORIES
+from typing import List, Dict, Optional, Tuple, Any, Iterable, Iterator
+from ..utils.config import DB_CONFIG
+from .connection import apply_pragmas
+from .pool import ConnectionPool
+from .cache import QueryCache
+from .profiler import QueryProfiler
+from .write_behind import WriteBehindQueue
+from .migrations import migrate
+
+# 从写语句中解析被修改的表名
+_WRITTEN_TABLE = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+(\w+)',
+    re.IGNORECASE
+)
+
+class _TransactionState(threading.local):
+    """每个线程各自的事务状态：嵌套层数和事务中修改过的表"""
+    depth = 0
+    tables = None
 
 class DatabaseManager:
     def __init__(self):
         self.db_path = DB_CONFIG['database_path']
+        self.pool = None
         self.connection = None
+        self.account_fts_enabled = False
+        self.item_fts_enabled = False
+        self._transaction_state = _TransactionState()
+        self.cache = QueryCache(DB_CONFIG.get('query_cache_size', 128),
+                                DB_CONFIG.get('query_cache_max_rows', 50000),
+                                DB_CONFIG.get('query_cache_max_result_rows', 5000))
+        self.profiler = QueryProfiler(DB_CONFIG.get('slow_query_ms'),
+                                      enabled=DB_CONFIG.get('query_profiling', True))
+        self._data_version = None
+        self._category_maps = None
+        self.write_behind = None
         self.connect()
         self.initialize_database()
 
     def connect(self):
         """连接数据库"""
         try:
-            self.connection = sqlite3.connect(self.db_path)
-            self.connection.row_factory = sqlite3.Row  # 使结果可以通过列名访问
+            self.pool = ConnectionPool(self.db_path, DB_CONFIG.get('pragmas'))
+            self.connection = self.pool.writer_connection
             return True
         except Exception as e:
             print(f"数据库连接失败: {e}")
             return False
 
     def initialize_database(self):
-        """初始化数据库表结构"""
+        """初始化数据库表结构（执行未完成的迁移）"""
         try:
-            cursor = self.connection.cursor()
-
-            # 创建分类表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
-                    color TEXT DEFAULT '#1890ff',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # 创建账目表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS accounts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
-                    amount REAL NOT NULL CHECK (amount > 0),
-                    category_id INTEGER NOT NULL,
-                    description TEXT,
-                    date DATE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (category_id) REFERENCES categories (id)
-                )
-            ''')
-
-            # 创建物品类别表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS item_categories (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            # 创建物品表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS items (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    category_id INTEGER,
-                    quantity REAL DEFAULT 0,
-                    unit TEXT DEFAULT '个',
-                    unit_price REAL DEFAULT 0,
-                    min_quantity REAL DEFAULT 0,
-                    description TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (category_id) REFERENCES item_categories (id)
-                )
-            ''')
-
-            # 创建库存变动记录表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS inventory_transactions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    item_id INTEGER NOT NULL,
-                    type TEXT NOT NULL CHECK (type IN ('in', 'out')),
-                    quantity REAL NOT NULL,
-                    unit_price REAL DEFAULT 0,
-                    reason TEXT,
-                    date DATE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (item_id) REFERENCES items (id)
-                )
-            ''')
-
-            # 创建设置表
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS settings (
-                    key TEXT PRIMARY KEY,
-                    value TEXT,
-                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-
-            self.connection.commit()
-
-            # 插入默认数据
-            self.insert_default_data()
-
+            with self.pool.writer() as connection:
+                migrate(connection)
         except Exception as e:
             print(f"数据库初始化失败: {e}")
-            self.connection.rollback()
-
-    def insert_default_data(self):
-        """插入默认数据"""
-        try:
-            cursor = self.connection.cursor()
-
-            # 插入默认分类
-            for category_type, categories in DEFAULT_CATEGORIES.items():
-                for category in categories:
-                    cursor.execute('''
-                        INSERT OR IGNORE INTO categories (name, type, color)
-                        VALUES (?, ?, ?)
-                    ''', (category['name'], category_type, category['color']))
-
-            # 插入默认物品分类
-            for category in DEFAULT_INVENTORY_CATEGORIES:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO item_categories (name, description)
-                    VALUES (?, ?)
-                ''', (category['name'], category['description']))
 
-            self.connection.commit()
-
-        except Exception as e:
-            print(f"插入默认数据失败: {e}")
-            self.connection.rollback()
+        # 旧版SQLite不支持 trigram 分词器时不会创建全文索引
+        self.account_fts_enabled = self._table_exists('accounts_fts')
+        self.item_fts_enabled = self._table_exists('items_fts')
+
+    def _table_exists(self, name: str) -> bool:
+        """检查表（含虚拟表）是否存在"""
+        rows = self.execute_query(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        )
+        return bool(rows)
+
+    @contextmanager
+    def bulk_import_mode(self):
+        """临时切换到批量导入连接参数，退出时恢复原设置
+
+        用法：
+            with db.bulk_import_mode():
+                db.add_accounts_bulk(rows)
+        """
+        with self.pool.writer() as connection:
+            previous = apply_pragmas(connection, DB_CONFIG.get('bulk_import_pragmas'))
+            try:
+                yield self
+            finally:
+                apply_pragmas(connection, previous)
+
+    @contextmanager
+    def transaction(self):
+        """事务上下文：块内的写操作不再逐条提交，退出时统一提交，出错时整体回滚
+
+        可以嵌套使用，内层通过 SAVEPOINT 实现，出错时只回滚内层的修改。
+        块内的写操作失败时会抛出异常而不是返回0，以保证整体的原子性。
+        事务期间持有写锁，其他线程的写操作会等待。
+
+        用法：
+            with db.transaction():
+                item_id = db.add_item(...)
+                db.add_inventory_transaction(item_id, 'in', ...)
+        """
+        with self.pool.writer() as connection:
+            depth = self._transaction_state.depth
+            savepoint = f"sp_{depth}"
+            if depth == 0:
+                connection.execute("BEGIN")
+                self._transaction_state.tables = set()
+            else:
+                connection.execute(f"SAVEPOINT {savepoint}")
+
+            self._transaction_state.depth = depth + 1
+            try:
+                yield self
+            except BaseException:
+                if depth == 0:
+                    connection.rollback()
+                else:
+                    connection.execute(f"ROLLBACK TO {savepoint}")
+                    connection.execute(f"RELEASE {savepoint}")
+                raise
+            else:
+                if depth == 0:
+                    start = time.perf_counter()
+                    connection.commit()
+                    # 提交耗时计入开启事务的方法
+                    self.profiler.record('COMMIT', (), (time.perf_counter() - start) * 1000, 0)
+                else:
+                    connection.execute(f"RELEASE {savepoint}")
+            finally:
+                self._transaction_state.depth = depth
+                if depth == 0:
+                    # 提交或回滚后，其他线程在事务期间缓存的结果也需要失效
+                    self.cache.invalidate(self._transaction_state.tables)
+                    self._transaction_state.tables = None
+
+    def in_transaction(self) -> bool:
+        """当前线程是否处于 transaction() 块内"""
+        return self._transaction_state.depth > 0
+
+    @contextmanager
+    def _write(self, *tables: str, query: str, params: Optional[tuple] = None):
+        """获取写连接的游标：事务块外执行完自动提交，出错回滚；块内交给外层事务
+
+        tables 为本次写入修改的表，用于使查询缓存失效；为空时清空全部缓存。
+        query 为记录到性能统计中的语句，耗时从取得写锁开始到提交完成为止（含提交和同步磁盘）；
+        params 为 None（批量写入）时慢查询不输出查询计划。
+        """
+        written = tables or None
+        with self.pool.writer() as connection:
+            cursor = connection.cursor()
+            start = time.perf_counter()
+            if self.in_transaction():
+                yield cursor
+                self._record_write(query, params, start, cursor)
+                self.cache.invalidate(written)
+                if written is None:
+                    self._transaction_state.tables = None
+                elif self._transaction_state.tables is not None:
+                    self._transaction_state.tables.update(written)
+                return
+
+            try:
+                yield cursor
+                connection.commit()
+            except BaseException:
+                connection.rollback()
+                raise
+            finally:
+                self.cache.invalidate(written)
+            self._record_write(query, params, start, cursor)
+
+    def _record_write(self, query: str, params: Optional[tuple], start: float,
+                      cursor: sqlite3.Cursor):
+        """记录一次写入的耗时和影响的行数"""
+        self.profiler.record(query, params or (), (time.perf_counter() - start) * 1000,
+                             max(cursor.rowcount, 0),
+                             cursor.connection if params is not None else None)
+
+    @staticmethod
+    def _written_tables(query: str) -> Tuple[str, ...]:
+        """解析写语句修改的表，无法解析时返回空元组（清空全部缓存）"""
+        match = _WRITTEN_TABLE.match(query)
+        return (match.group(1),) if match else ()
+
+    def _cached_query(self, query: str, params: tuple, tables: Tuple[str, ...]) -> List[Dict]:
+        """带缓存地执行查询，以语句和参数为键，tables 为查询依赖的表
+
+        返回结果的副本以免调用方修改缓存内容。
+        其他进程修改数据库时 PRAGMA data_version 会变化，此时清空全部缓存。
+        """
+        self._check_data_version()
+
+        key = (query, params)
+        found, result = self.cache.get(key, tables)
+        if not found:
+            generations = self.cache.generations(tables)
+            result = [dict(row) for row in self.execute_query(query, params)]
+            self.cache.put(key, generations, result)
+        return [dict(row) for row in result]
+
+    def _check_data_version(self):
+        """其他进程提交修改后 PRAGMA data_version 会变化，此时清空全部缓存"""
+        data_version = self.pool.writer_connection.execute("PRAGMA data_version").fetchone()[0]
+        if data_version != self._data_version:
+            self._data_version = data_version
+            self.cache.invalidate()
+
+    def category_maps(self) -> Tuple[Dict[int, Dict], Dict[int, str]]:
+        """获取内存中的分类字典 (账目分类 id -> 分类, 物品类别 id -> 名称)
+
+        分类表只有几十行，首次使用时加载，分类或物品类别被修改后自动重新加载，
+        账目和物品查询据此补充分类名称和颜色，无需关联分类表。
+        """
+        self._check_data_version()
+        generations = self.cache.generations(('categories', 'item_categories'))
+        maps = self._category_maps
+        if maps is None or maps[0] != generations:
+            categories = {
+                row['id']: dict(row)
+                for row in self.execute_query("SELECT id, name, type, color FROM categories")
+            }
+            item_categories = {
+                row['id']: row['name']
+                for row in self.execute_query("SELECT id, name FROM item_categories")
+            }
+            maps = self._category_maps = (generations, categories, item_categories)
+        return maps[1], maps[2]
+
+    def _decorate_account(self, row: Dict, categories: Dict[int, Dict]) -> Dict:
+        """为账目补充分类名称和颜色"""
+        category = categories.get(row['category_id'])
+        row['category_name'] = category['name'] if category else None
+        row['category_color'] = category['color'] if category else None
+        return row
+
+    def _decorate_item(self, row: Dict, item_categories: Dict[int, str]) -> Dict:
+        """为物品补充类别名称"""
+        row['category_name'] = item_categories.get(row['category_id'])
+        return row
+
+    def _reader(self) -> sqlite3.Connection:
+        """当前线程用于读取的连接：事务块内使用写连接，以便读到本事务尚未提交的修改"""
+        if self.in_transaction():
+            return self.pool.writer_connection
+        return self.pool.reader()
 
     def execute_query(self, query: str, params: tuple = ()) -> List[sqlite3.Row]:
-        """执行查询并返回结果"""
+        """执行查询并返回结果（可在任意线程调用）"""
+        self._flush_pending()
         try:
-            cursor = self.connection.cursor()
+            start = time.perf_counter()
+            cursor = self._reader().cursor()
             cursor.execute(query, params)
-            return cursor.fetchall()
+            rows = cursor.fetchall()
+            self.profiler.record(query, params, (time.perf_counter() - start) * 1000,
+                                 len(rows), cursor.connection)
+            return rows
         except Exception as e:
             print(f"查询执行失败: {e}")
             return []
 
+    def iter_query(self, query: str, params: tuple = (),
+                   batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """执行查询并逐行返回字典，每次从游标读取 batch_size 行（可在任意线程调用）"""
+        batch_size = batch_size or DB_CONFIG.get('fetch_batch_size', 1000)
+        self._flush_pending()
+        try:
+            # 只统计读取游标的时间，不含调用方处理每行的时间
+            start = time.perf_counter()
+            cursor = self._reader().cursor()
+            cursor.execute(query, params)
+            elapsed = time.perf_counter() - start
+            count = 0
+            while True:
+                start = time.perf_counter()
+                rows = cursor.fetchmany(batch_size)
+                elapsed += time.perf_counter() - start
+                if not rows:
+                    break
+                count += len(rows)
+                for row in rows:
+                    yield dict(row)
+            self.profiler.record(query, params, elapsed * 1000, count, cursor.connection)
+        except Exception as e:
+            print(f"查询执行失败: {e}")
+
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """执行更新操作并返回影响的行数"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            self.connection.commit()
+            with self._write(*self._written_tables(query), query=query, params=params) as cursor:
+                cursor.execute(query, params)
             return cursor.rowcount
         except Exception as e:
+            if self.in_transaction():
+                raise
             print(f"更新执行失败: {e}")
-            self.connection.rollback()
             return 0
 
     def execute_insert(self, query: str, params: tuple = ()) -> int:
         """执行插入操作并返回插入的ID"""
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params)
-            self.connection.commit()
+            with self._write(*self._written_tables(query), query=query, params=params) as cursor:
+                cursor.execute(query, params)
             return cursor.lastrowid
         except Exception as e:
+            if self.in_transaction():
+                raise
             print(f"插入执行失败: {e}")
-            self.connection.rollback()
             return 0
 
     # ========== 分类相关操作 ==========
@@ -185,8 +327,7 @@ class DatabaseManager:
 
         query += " ORDER BY name"
 
-        rows = self.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+        return self._cached_query(query, tuple(params), ('categories',))
 
     def add_category(self, name: str, category_type: str, color: str = '#1890ff') -> int:
         """添加分类"""
@@ -195,7 +336,7 @@ class DatabaseManager:
 
     def update_category(self, category_id: int, name: str, color: str) -> int:
         """更新分类"""
-        query = "UPDATE categories SET name = ?, color = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+        query = "UPDATE categories SET name = ?, color = ? WHERE id = ?"
         return self.execute_update(query, (name, color, category_id))
 
     def delete_category(self, category_id: int) -> int:
@@ -206,55 +347,345 @@ class DatabaseManager:
     # ========== 账目相关操作 ==========
     def get_accounts(self, filters: Dict = None) -> List[Dict]:
         """获取账目列表"""
+        query, params = self._accounts_query(filters or {})
+        categories, _ = self.category_maps()
+        return [self._decorate_account(dict(row), categories) for row in self.execute_query(query, params)]
+
+    def iter_accounts(self, filters: Dict = None, batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """逐行获取账目（分批读取），用于导出和大数据量统计，内存占用固定"""
+        query, params = self._accounts_query(filters or {})
+        categories, _ = self.category_maps()
+        return (self._decorate_account(row, categories)
+                for row in self.iter_query(query, params, batch_size))
+
+    def get_accounts_columns(self, filters: Dict = None, amount_in_cents: bool = False,
+                             batch_size: Optional[int] = None) -> Dict[str, Any]:
+        """按列获取账目数据（NumPy 数组），用于向量化统计分析
+
+        返回字典：id (int64)、date (datetime64[D])、amount (float64，
+        amount_in_cents 为 True 时为以分为单位的 int64)、category_id (int32)、
+        is_income (bool)。数组按行数预先分配，从游标分批直接填充。
+        """
+        import numpy as np
+
         if filters is None:
             filters = {}
 
-        query = '''
-            SELECT a.*, c.name as category_name, c.color as category_color
+        self._flush_pending()
+        conditions, params = self._build_account_conditions(filters)
+        from_clause = f"FROM accounts a WHERE {conditions}"
+        count = self.execute_query(f"SELECT COUNT(*) {from_clause}", tuple(params))
+        capacity = count[0][0] if count else 0
+        if 'limit' in filters:
+            capacity = min(capacity, filters['limit'])
+
+        query = f'''
+            SELECT a.id, a.date, a.amount, a.category_id, a.type = 'income'
+            {from_clause}
+            ORDER BY a.date DESC, a.created_at DESC, a.id DESC
+        '''
+        if 'limit' in filters:
+            query += " LIMIT ?"
+            params.append(filters['limit'])
+
+        columns = {
+            'id': np.empty(capacity, dtype=np.int64),
+            'date': np.empty(capacity, dtype='datetime64[D]'),
+            'amount': np.empty(capacity, dtype=np.int64 if amount_in_cents else np.float64),
+            'category_id': np.empty(capacity, dtype=np.int32),
+            'is_income': np.empty(capacity, dtype=bool),
+        }
+
+        batch_size = batch_size or DB_CONFIG.get('fetch_batch_size', 1000)
+        size = 0
+        try:
+            cursor = self._reader().cursor()
+            cursor.row_factory = None  # 直接使用元组，避免创建 Row 对象
+            cursor.execute(query, tuple(params))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+
+                end = size + len(rows)
+                if end > len(columns['id']):
+                    # 统计行数之后又有新数据写入时扩容
+                    for name, array in columns.items():
+                        columns[name] = np.resize(array, max(end, len(array) * 2))
+
+                ids, dates, amounts, category_ids, is_income = zip(*rows)
+                columns['id'][size:end] = ids
+                columns['date'][size:end] = np.array(dates, dtype='datetime64[D]')
+                if amount_in_cents:
+                    columns['amount'][size:end] = np.rint(np.array(amounts, dtype=np.float64) * 100)
+                else:
+                    columns['amount'][size:end] = amounts
+                columns['category_id'][size:end] = category_ids
+                columns['is_income'][size:end] = is_income
+                size = end
+        except Exception as e:
+            print(f"查询执行失败: {e}")
+
+        return {name: array[:size] for name, array in columns.items()}
+
+    def _accounts_query(self, filters: Dict) -> Tuple[str, tuple]:
+        """生成账目列表查询语句和参数"""
+        conditions, params = self._build_account_conditions(filters)
+        query = f'''
+            SELECT a.*
             FROM accounts a
-            LEFT JOIN categories c ON a.category_id = c.id
-            WHERE 1=1
+            WHERE {conditions}
+            ORDER BY a.date DESC, a.created_at DESC, a.id DESC
         '''
+
+        if 'limit' in filters:
+            query += " LIMIT ?"
+            params.append(filters['limit'])
+
+        return query, tuple(params)
+
+    def get_accounts_page(self, filters: Dict = None, cursor: Optional[str] = None,
+                          page_size: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """按游标分页获取账目，返回 (当前页, 下一页游标)
+
+        按 (date, created_at, id) 倒序定位，翻到任意深度的代价都与第一页相同。
+        没有更多数据时下一页游标为 None。
+        """
+        if filters is None:
+            filters = {}
+
+        conditions, params = self._build_account_conditions(filters)
+        if cursor:
+            conditions += " AND (a.date, a.created_at, a.id) < (?, ?, ?)"
+            params.extend(self._decode_cursor(cursor))
+
+        query = f'''
+            SELECT a.*
+            FROM accounts a
+            WHERE {conditions}
+            ORDER BY a.date DESC, a.created_at DESC, a.id DESC
+            LIMIT ?
+        '''
+        params.append(page_size + 1)
+
+        categories, _ = self.category_maps()
+        rows = [self._decorate_account(dict(row), categories)
+                for row in self.execute_query(query, tuple(params))]
+        return self._split_page(rows, page_size)
+
+    def _build_account_conditions(self, filters: Dict) -> Tuple[str, List]:
+        """根据筛选条件生成账目查询的 WHERE 子句和参数"""
+        conditions = "1=1"
         params = []
 
         if 'type' in filters:
-            query += " AND a.type = ?"
+            conditions += " AND a.type = ?"
             params.append(filters['type'])
 
         if 'category_id' in filters and filters['category_id']:
-            query += " AND a.category_id = ?"
+            conditions += " AND a.category_id = ?"
             params.append(filters['category_id'])
 
         if 'start_date' in filters and filters['start_date']:
-            query += " AND a.date >= ?"
+            conditions += " AND a.date >= ?"
             params.append(filters['start_date'])
 
         if 'end_date' in filters and filters['end_date']:
-            query += " AND a.date <= ?"
+            conditions += " AND a.date <= ?"
             params.append(filters['end_date'])
 
         if 'keyword' in filters and filters['keyword']:
-            query += " AND (a.description LIKE ? OR c.name LIKE ?)"
-            keyword = f"%{filters['keyword']}%"
-            params.extend([keyword, keyword])
+            match = self._account_fts_query(filters['keyword'])
+            if match:
+                conditions += " AND a.id IN (SELECT rowid FROM accounts_fts WHERE accounts_fts MATCH ?)"
+                params.append(match)
+            else:
+                # 分类名称在内存字典中匹配，转换为分类 id 条件
+                keyword = filters['keyword']
+                categories, _ = self.category_maps()
+                category_ids = [
+                    category_id for category_id, category in categories.items()
+                    if keyword.lower() in category['name'].lower()
+                ]
+                conditions += " AND (a.description LIKE ?"
+                params.append(f"%{keyword}%")
+                if category_ids:
+                    conditions += f" OR a.category_id IN ({', '.join('?' * len(category_ids))})"
+                    params.extend(category_ids)
+                conditions += ")"
+
+        return conditions, params
+
+    def _account_fts_query(self, keyword: str) -> Optional[str]:
+        """生成账目全文检索的 MATCH 表达式，无法使用全文索引时返回 None
+
+        trigram 索引只能匹配至少3个字符的关键字，更短的关键字仍走 LIKE 查询。
+        """
+        keyword = keyword.strip()
+        if not self.account_fts_enabled or len(keyword) < 3:
+            return None
+        # 作为短语整体匹配，与 LIKE '%关键字%' 的语义一致
+        return '"' + keyword.replace('"', '""') + '"'
+
+    def search_accounts(self, keyword: str, limit: int = 50) -> List[Dict]:
+        """按关键字搜索账目（描述和分类名称），结果按相关度排序"""
+        match = self._account_fts_query(keyword)
+        if match is None:
+            # 关键字太短或不支持全文索引时按日期排序返回
+            return self.get_accounts({'keyword': keyword, 'limit': limit})
 
-        query += " ORDER BY a.date DESC, a.created_at DESC"
-
-        if 'limit' in filters:
-            query += " LIMIT ?"
-            params.append(filters['limit'])
-
-        rows = self.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+        query = '''
+            SELECT a.*
+            FROM accounts_fts f
+            JOIN accounts a ON a.id = f.rowid
+            WHERE accounts_fts MATCH ?
+            ORDER BY f.rank, a.date DESC
+            LIMIT ?
+        '''
+        categories, _ = self.category_maps()
+        return [self._decorate_account(dict(row), categories)
+                for row in self.execute_query(query, (match, limit))]
+
+    @staticmethod
+    def _encode_cursor(row: Dict) -> str:
+        """将一行的排序键编码为不透明的分页游标"""
+        key = json.dumps([row['date'], row['created_at'], row['id']])
+        return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii')
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> List:
+        """解码分页游标"""
+        try:
+            key = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except ValueError as e:
+            raise ValueError(f"无效的分页游标: {cursor}") from e
+        if not isinstance(key, list) or len(key) != 3:
+            raise ValueError(f"无效的分页游标: {cursor}")
+        return key
+
+    def _split_page(self, rows: List[Dict], page_size: int) -> Tuple[List[Dict], Optional[str]]:
+        """截取一页数据（查询时多取一行用于判断是否还有下一页）"""
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            return rows, self._encode_cursor(rows[-1])
+        return rows, None
 
     def add_account(self, account_type: str, amount: float, category_id: int,
                    description: str, date: str) -> int:
-        """添加账目"""
+        """添加账目
+
+        开启延迟写入（enable_write_behind）时先校验并加入队列，返回临时 id（负数）。
+        """
+        if self.write_behind is not None:
+            try:
+                row = self._normalize_account_row((account_type, amount, category_id, description, date))
+            except (TypeError, ValueError) as e:
+                print(f"插入执行失败: 数据格式错误: {e}")
+                return 0
+            categories, _ = self.category_maps()
+            reason = self._validate_account_row(row, categories)
+            if reason:
+                print(f"插入执行失败: {reason}")
+                return 0
+            return self.write_behind.add_account(row)
+
+        return self._insert_account(account_type, amount, category_id, description, date)
+
+    def _insert_account(self, account_type: str, amount: float, category_id: int,
+                        description: str, date: str, fingerprint: Optional[str] = None,
+                        source: Optional[str] = None) -> int:
+        """立即写入一条账目"""
         query = '''
-            INSERT INTO accounts (type, amount, category_id, description, date)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO accounts (type, amount, category_id, description, date, fingerprint, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        '''
+        return self.execute_insert(query, (account_type, amount, category_id, description, date,
+                                           fingerprint, source))
+
+    def add_accounts_bulk(self, accounts: Iterable,
+                          errors: Optional[List[Tuple[int, str]]] = None,
+                          skip_duplicates: bool = False) -> int:
+        """批量添加账目，在单个事务中提交，返回插入的行数
+
+        accounts 中的每一行可以是字典（键同 add_account 参数：type、amount、
+        category_id、description、date，可选 fingerprint、source），
+        也可以是按相同顺序排列的元组。
+        校验不通过的行会被跳过，并以 (行号, 原因) 的形式追加到 errors 中。
+        skip_duplicates 为 True 时跳过指纹已存在的行，否则指纹重复会导致整批失败。
+        """
+        categories, _ = self.category_maps()
+
+        def valid_rows():
+            for index, account in enumerate(accounts):
+                try:
+                    row = self._normalize_account_row(account)
+                except (KeyError, TypeError, ValueError) as e:
+                    reason = f"数据格式错误: {e}"
+                else:
+                    reason = self._validate_account_row(row, categories)
+                    if reason is None:
+                        yield row
+                        continue
+
+                if errors is not None:
+                    errors.append((index, reason))
+
+        query = f'''
+            INSERT {'OR IGNORE' if skip_duplicates else ''}
+            INTO accounts (type, amount, category_id, description, date, fingerprint, source)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         '''
-        return self.execute_insert(query, (account_type, amount, category_id, description, date))
+        try:
+            with self._write('accounts', query=query) as cursor:
+                cursor.executemany(query, valid_rows())
+            return cursor.rowcount
+        except Exception as e:
+            if self.in_transaction():
+                raise
+            print(f"批量插入账目失败: {e}")
+            return 0
+
+    @staticmethod
+    def _validate_account_row(row: Tuple, categories: Dict[int, Dict]) -> Optional[str]:
+        """校验账目参数元组，不通过时返回原因"""
+        account_type, amount, category_id = row[0], row[1], row[2]
+        if account_type not in ('income', 'expense'):
+            return f"无效的账目类型: {account_type}"
+        if not (math.isfinite(amount) and amount > 0):
+            return f"金额必须是大于0的有限数: {amount}"
+        if category_id not in categories:
+            return f"分类不存在: {category_id}"
+        if categories[category_id]['type'] != account_type:
+            return f"分类类型不匹配: {category_id}"
+        if not row[4]:
+            return "日期不能为空"
+        return None
+
+    @staticmethod
+    def _normalize_account_row(account) -> Tuple:
+        """将字典或元组形式的账目转换为插入参数元组（含指纹和来源）"""
+        if isinstance(account, dict):
+            account = (account['type'], account['amount'], account['category_id'],
+                       account.get('description'), account['date'],
+                       account.get('fingerprint'), account.get('source'))
+        account_type, amount, category_id, description, date, *extra = account
+        fingerprint, source = (tuple(extra) + (None, None))[:2]
+        return (account_type, float(amount), int(category_id), description, str(date),
+                fingerprint, source)
+
+    def find_account_fingerprints(self, fingerprints: Iterable[str]) -> Dict[str, int]:
+        """查找已存在的账目指纹，返回 指纹 -> 账目id（通过唯一索引逐个定位）"""
+        fingerprints = list(fingerprints)
+        found = {}
+        # 每条语句的参数个数有上限，分批查询
+        for start in range(0, len(fingerprints), 500):
+            chunk = fingerprints[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            rows = self.execute_query(
+                f"SELECT id, fingerprint FROM accounts WHERE fingerprint IN ({placeholders})",
+                tuple(chunk))
+            found.update((row['fingerprint'], row['id']) for row in rows)
+        return found
 
     def update_account(self, account_id: int, updates: Dict) -> int:
         """更新账目"""
@@ -263,37 +694,99 @@ class DatabaseManager:
 
         set_clause = ', '.join([f"{key} = ?" for key in updates.keys()])
         query = f"UPDATE accounts SET {set_clause}, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
-        params = list(updates.values()) + [account_id]
+        params = list(updates.values()) + [self._resolve_account_id(account_id)]
         return self.execute_update(query, tuple(params))
 
     def delete_account(self, account_id: int) -> int:
         """删除账目"""
         query = "DELETE FROM accounts WHERE id = ?"
-        return self.execute_update(query, (account_id,))
+        return self.execute_update(query, (self._resolve_account_id(account_id),))
+
+    # ========== 延迟写入 ==========
+    def enable_write_behind(self, flush_interval_ms: Optional[int] = None,
+                            max_rows: Optional[int] = None):
+        """开启账目延迟写入：add_account 立即返回临时 id，定时或攒够条数后批量提交"""
+        if self.write_behind is None:
+            self.write_behind = WriteBehindQueue(
+                self,
+                flush_interval_ms or DB_CONFIG.get('write_behind_interval_ms', 500),
+                max_rows or DB_CONFIG.get('write_behind_max_rows', 50)
+            )
+
+    def disable_write_behind(self):
+        """写入队列中剩余的账目并关闭延迟写入"""
+        if self.write_behind is not None:
+            self.write_behind.close()
+            self.write_behind = None
+
+    def flush(self) -> int:
+        """立即写入延迟队列中的账目，返回写入的条数"""
+        if self.write_behind is None:
+            return 0
+        return self.write_behind.flush()
+
+    def _flush_pending(self):
+        """读取前先写入队列中的账目，保证能读到刚添加的数据
+
+        写连接正被其他线程占用（如后台导入）时不等待，以免阻塞读取或与之死锁，
+        此时读不到队列中的账目，它们由定时器在写连接空闲后写入。
+        """
+        if self.write_behind is not None and self.write_behind.pending:
+            self.write_behind.flush(blocking=False)
+
+    def _resolve_account_id(self, account_id: int) -> int:
+        """将延迟写入返回的临时 id 转换为真实 id"""
+        if account_id < 0 and self.write_behind is not None:
+            self.write_behind.flush()
+            return self.write_behind.resolve_id(account_id) or account_id
+        return account_id
 
     # ========== 统计相关操作 ==========
     def get_account_summary(self, start_date: str, end_date: str) -> List[Dict]:
         """获取账目汇总"""
+        months = self._whole_month_range(start_date, end_date)
+        if months:
+            # 整月范围直接读取按月汇总表
+            query = '''
+                SELECT type, SUM(total) as total, SUM(count) as count
+                FROM monthly_category_totals
+                WHERE month BETWEEN ? AND ?
+                GROUP BY type
+                HAVING SUM(count) > 0
+            '''
+            return self._cached_query(query, months, ('accounts',))
+
         query = '''
             SELECT type, SUM(amount) as total, COUNT(*) as count
             FROM accounts
             WHERE date BETWEEN ? AND ?
             GROUP BY type
         '''
-        rows = self.execute_query(query, (start_date, end_date))
-        return [dict(row) for row in rows]
+        return self._cached_query(query, (start_date, end_date), ('accounts',))
 
     def get_category_summary(self, start_date: str, end_date: str,
                            category_type: Optional[str] = None) -> List[Dict]:
         """获取分类汇总"""
-        query = '''
-            SELECT c.name, c.color, COALESCE(SUM(a.amount), 0) as total,
-                   COALESCE(COUNT(a.id), 0) as count
-            FROM categories c
-            LEFT JOIN accounts a ON c.id = a.category_id
-                AND a.date BETWEEN ? AND ?
-        '''
-        params = [start_date, end_date]
+        months = self._whole_month_range(start_date, end_date)
+        if months:
+            # 整月范围直接读取按月汇总表
+            query = '''
+                SELECT c.name, c.color, COALESCE(SUM(m.total), 0) as total,
+                       COALESCE(SUM(m.count), 0) as count
+                FROM categories c
+                LEFT JOIN monthly_category_totals m ON c.id = m.category_id
+                    AND m.month BETWEEN ? AND ?
+            '''
+            params = list(months)
+        else:
+            query = '''
+                SELECT c.name, c.color, COALESCE(SUM(a.amount), 0) as total,
+                       COALESCE(COUNT(a.id), 0) as count
+                FROM categories c
+                LEFT JOIN accounts a ON c.id = a.category_id
+                    AND a.date BETWEEN ? AND ?
+            '''
+            params = [start_date, end_date]
 
         if category_type:
             query += " WHERE c.type = ?"
@@ -301,39 +794,117 @@ class DatabaseManager:
 
         query += " GROUP BY c.id, c.name, c.color ORDER BY total DESC"
 
-        rows = self.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+        return self._cached_query(query, tuple(params), ('accounts', 'categories'))
+
+    def get_monthly_summary(self, start_month: str, end_month: str,
+                            category_type: Optional[str] = None) -> List[Dict]:
+        """获取按月收支汇总（月份格式 YYYY-MM），用于趋势统计"""
+        query = '''
+            SELECT month, type, SUM(total) as total, SUM(count) as count
+            FROM monthly_category_totals
+            WHERE month BETWEEN ? AND ?
+        '''
+        params = [start_month, end_month]
+
+        if category_type:
+            query += " AND type = ?"
+            params.append(category_type)
+
+        query += " GROUP BY month, type HAVING SUM(count) > 0 ORDER BY month"
+
+        return self._cached_query(query, tuple(params), ('accounts',))
+
+    @staticmethod
+    def _whole_month_range(start_date: str, end_date: str) -> Optional[Tuple[str, str]]:
+        """日期范围正好覆盖若干整月时返回 (起始月份, 结束月份)，否则返回 None"""
+        try:
+            start = datetime.strptime(start_date, '%Y-%m-%d')
+            end = datetime.strptime(end_date, '%Y-%m-%d')
+        except (TypeError, ValueError):
+            return None
+
+        last_day = calendar.monthrange(end.year, end.month)[1]
+        if start.day != 1 or end.day != last_day or end < start:
+            return None
+        return start.strftime('%Y-%m'), end.strftime('%Y-%m')
 
     # ========== 物品相关操作 ==========
     def get_items(self, filters: Dict = None) -> List[Dict]:
         """获取物品列表"""
-        if filters is None:
-            filters = {}
+        query, params = self._items_query(filters or {})
+        _, item_categories = self.category_maps()
+        return [self._decorate_item(row, item_categories)
+                for row in self._cached_query(query, params, ('items',))]
+
+    def iter_items(self, filters: Dict = None, batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """逐行获取物品（分批读取），内存占用固定"""
+        query, params = self._items_query(filters or {})
+        _, item_categories = self.category_maps()
+        return (self._decorate_item(row, item_categories)
+                for row in self.iter_query(query, params, batch_size))
+
+    def _items_query(self, filters: Dict) -> Tuple[str, tuple]:
+        """生成物品列表查询语句和参数"""
+        conditions, params = self._build_item_conditions(filters)
+        query = f'''
+            SELECT i.*
+            FROM items i
+            WHERE {conditions}
+            ORDER BY i.name
+        '''
+        return query, tuple(params)
+
+    def search_items(self, keyword: str, limit: int = 20) -> List[Dict]:
+        """按前缀搜索物品（名称、描述、类别名称），结果按相关度排序
+
+        适合输入时实时调用，名称匹配的权重高于类别和描述。
+        """
+        match = self._item_fts_query(keyword)
+        if match is None:
+            return self.get_items({'keyword': keyword})[:limit]
 
         query = '''
-            SELECT i.*, ic.name as category_name
-            FROM items i
-            LEFT JOIN item_categories ic ON i.category_id = ic.id
-            WHERE 1=1
+            SELECT i.*
+            FROM items_fts f
+            JOIN items i ON i.id = f.rowid
+            WHERE items_fts MATCH ?
+            ORDER BY bm25(items_fts, 10.0, 1.0, 2.0), i.name
+            LIMIT ?
         '''
+        _, item_categories = self.category_maps()
+        return [self._decorate_item(dict(row), item_categories)
+                for row in self.execute_query(query, (match, limit))]
+
+    def _build_item_conditions(self, filters: Dict) -> Tuple[str, List]:
+        """根据筛选条件生成物品查询的 WHERE 子句和参数"""
+        conditions = "1=1"
         params = []
 
         if 'category_id' in filters and filters['category_id']:
-            query += " AND i.category_id = ?"
+            conditions += " AND i.category_id = ?"
             params.append(filters['category_id'])
 
+        # 按子串匹配：unicode61 分词器把连续的中文视为一个词，前缀索引找不到词中间的字，
+        # 只在 search_items 中使用
         if 'keyword' in filters and filters['keyword']:
-            query += " AND (i.name LIKE ? OR i.description LIKE ?)"
+            conditions += " AND (i.name LIKE ? OR i.description LIKE ?)"
             keyword = f"%{filters['keyword']}%"
             params.extend([keyword, keyword])
 
         if 'low_stock' in filters and filters['low_stock']:
-            query += " AND i.quantity <= i.min_quantity AND i.min_quantity > 0"
+            conditions += " AND i.quantity <= i.min_quantity AND i.min_quantity > 0"
 
-        query += " ORDER BY i.name"
+        return conditions, params
 
-        rows = self.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+    def _item_fts_query(self, keyword: str) -> Optional[str]:
+        """生成物品全文检索的前缀匹配表达式，无法使用全文索引时返回 None
+
+        多个关键字之间为“且”的关系，每个关键字按前缀匹配。
+        """
+        terms = keyword.split()
+        if not self.item_fts_enabled or not terms:
+            return None
+        return ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
 
     def add_item(self, name: str, category_id: Optional[int], quantity: float,
                 unit: str, unit_price: float, min_quantity: float, description: str) -> int:
@@ -362,67 +933,182 @@ class DatabaseManager:
     # ========== 库存变动相关操作 ==========
     def add_inventory_transaction(self, item_id: int, transaction_type: str,
                                  quantity: float, unit_price: float, reason: str, date: str) -> int:
-        """添加库存变动记录"""
-        # 先添加变动记录
+        """添加库存变动记录（变动记录与库存更新在同一事务中提交）"""
         query = '''
             INSERT INTO inventory_transactions (item_id, type, quantity, unit_price, reason, date)
             VALUES (?, ?, ?, ?, ?, ?)
         '''
-        result = self.execute_insert(query, (item_id, transaction_type, quantity, unit_price, reason, date))
+        update_query = "UPDATE items SET quantity = quantity + ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+        delta = quantity if transaction_type == 'in' else -quantity
 
-        # 更新物品库存
-        if transaction_type == 'in':
-            update_query = "UPDATE items SET quantity = quantity + ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
-        else:
-            update_query = "UPDATE items SET quantity = quantity - ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+        try:
+            with self._write('inventory_transactions', 'items', query=query,
+                             params=(item_id, transaction_type, quantity, unit_price, reason, date)) as cursor:
+                # 先添加变动记录
+                cursor.execute(query, (item_id, transaction_type, quantity, unit_price, reason, date))
+                result = cursor.lastrowid
+                # 更新物品库存
+                cursor.execute(update_query, (delta, item_id))
+            return result
+        except Exception as e:
+            if self.in_transaction():
+                raise
+            print(f"添加库存变动失败: {e}")
+            return 0
 
-        self.execute_update(update_query, (quantity, item_id))
+    def add_inventory_transactions_bulk(self, transactions: Iterable,
+                                        errors: Optional[List[Tuple[int, str]]] = None) -> int:
+        """批量添加库存变动（如盘点、采购入库），在单个事务中提交，返回插入的行数
+
+        transactions 中的每一行可以是字典（键：item_id、type、quantity、unit_price、
+        reason、date），也可以是按 add_inventory_transaction 参数顺序排列的元组。
+        同一物品的多次变动合并为一次库存更新。校验不通过的行会被跳过，
+        并以 (行号, 原因) 的形式追加到 errors 中。
+        """
+        item_ids = {row['id'] for row in self.execute_query("SELECT id FROM items")}
+        deltas: Dict[int, float] = {}
+
+        def valid_rows():
+            for index, transaction in enumerate(transactions):
+                try:
+                    row = self._normalize_inventory_transaction_row(transaction)
+                except (KeyError, TypeError, ValueError) as e:
+                    reason = f"数据格式错误: {e}"
+                else:
+                    item_id, transaction_type, quantity = row[0], row[1], row[2]
+                    if transaction_type not in ('in', 'out'):
+                        reason = f"无效的变动类型: {transaction_type}"
+                    elif not (math.isfinite(quantity) and quantity > 0):
+                        reason = f"数量必须是大于0的有限数: {quantity}"
+                    elif not (math.isfinite(row[3]) and row[3] >= 0):
+                        reason = f"单价必须是不小于0的有限数: {row[3]}"
+                    elif item_id not in item_ids:
+                        reason = f"物品不存在: {item_id}"
+                    elif not row[5]:
+                        reason = "日期不能为空"
+                    else:
+                        delta = quantity if transaction_type == 'in' else -quantity
+                        deltas[item_id] = deltas.get(item_id, 0) + delta
+                        yield row
+                        continue
+
+                if errors is not None:
+                    errors.append((index, reason))
 
-        return result
+        query = '''
+            INSERT INTO inventory_transactions (item_id, type, quantity, unit_price, reason, date)
+            VALUES (?, ?, ?, ?, ?, ?)
+        '''
+        update_query = "UPDATE items SET quantity = quantity + ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?"
+
+        try:
+            with self._write('inventory_transactions', 'items', query=query) as cursor:
+                cursor.executemany(query, valid_rows())
+                inserted = cursor.rowcount
+                cursor.executemany(update_query, [(delta, item_id) for item_id, delta in deltas.items()])
+            return inserted
+        except Exception as e:
+            if self.in_transaction():
+                raise
+            print(f"批量添加库存变动失败: {e}")
+            return 0
+
+    @staticmethod
+    def _normalize_inventory_transaction_row(transaction) -> Tuple:
+        """将字典或元组形式的库存变动转换为插入参数元组"""
+        if isinstance(transaction, dict):
+            transaction = (transaction['item_id'], transaction['type'], transaction['quantity'],
+                           transaction.get('unit_price', 0), transaction.get('reason'),
+                           transaction['date'])
+        item_id, transaction_type, quantity, unit_price, reason, date = transaction
+        return (int(item_id), transaction_type, float(quantity), float(unit_price or 0),
+                reason, str(date))
 
     def get_inventory_transactions(self, filters: Dict = None) -> List[Dict]:
         """获取库存变动记录"""
+        query, params = self._inventory_transactions_query(filters or {})
+        rows = self.execute_query(query, params)
+        return [dict(row) for row in rows]
+
+    def iter_inventory_transactions(self, filters: Dict = None,
+                                    batch_size: Optional[int] = None) -> Iterator[Dict]:
+        """逐行获取库存变动记录（分批读取），内存占用固定"""
+        query, params = self._inventory_transactions_query(filters or {})
+        return self.iter_query(query, params, batch_size)
+
+    def _inventory_transactions_query(self, filters: Dict) -> Tuple[str, tuple]:
+        """生成库存变动记录查询语句和参数"""
+        conditions, params = self._build_inventory_transaction_conditions(filters)
+        query = f'''
+            SELECT it.*, i.name as item_name, ic.name as category_name
+            FROM inventory_transactions it
+            LEFT JOIN items i ON it.item_id = i.id
+            LEFT JOIN item_categories ic ON i.category_id = ic.id
+            WHERE {conditions}
+            ORDER BY it.date DESC, it.created_at DESC, it.id DESC
+        '''
+
+        if 'limit' in filters:
+            query += " LIMIT ?"
+            params.append(filters['limit'])
+
+        return query, tuple(params)
+
+    def get_inventory_transactions_page(self, filters: Dict = None, cursor: Optional[str] = None,
+                                        page_size: int = 50) -> Tuple[List[Dict], Optional[str]]:
+        """按游标分页获取库存变动记录，返回 (当前页, 下一页游标)"""
         if filters is None:
             filters = {}
 
-        query = '''
+        conditions, params = self._build_inventory_transaction_conditions(filters)
+        if cursor:
+            conditions += " AND (it.date, it.created_at, it.id) < (?, ?, ?)"
+            params.extend(self._decode_cursor(cursor))
+
+        query = f'''
             SELECT it.*, i.name as item_name, ic.name as category_name
             FROM inventory_transactions it
             LEFT JOIN items i ON it.item_id = i.id
             LEFT JOIN item_categories ic ON i.category_id = ic.id
-            WHERE 1=1
+            WHERE {conditions}
+            ORDER BY it.date DESC, it.created_at DESC, it.id DESC
+            LIMIT ?
         '''
+        params.append(page_size + 1)
+
+        rows = [dict(row) for row in self.execute_query(query, tuple(params))]
+        return self._split_page(rows, page_size)
+
+    def _build_inventory_transaction_conditions(self, filters: Dict) -> Tuple[str, List]:
+        """根据筛选条件生成库存变动查询的 WHERE 子句和参数"""
+        conditions = "1=1"
         params = []
 
         if 'item_id' in filters and filters['item_id']:
-            query += " AND it.item_id = ?"
+            conditions += " AND it.item_id = ?"
             params.append(filters['item_id'])
 
         if 'type' in filters and filters['type']:
-            query += " AND it.type = ?"
+            conditions += " AND it.type = ?"
             params.append(filters['type'])
 
         if 'start_date' in filters and filters['start_date']:
-            query += " AND it.date >= ?"
+            conditions += " AND it.date >= ?"
             params.append(filters['start_date'])
 
         if 'end_date' in filters and filters['end_date']:
-            query += " AND it.date <= ?"
+            conditions += " AND it.date <= ?"
             params.append(filters['end_date'])
 
-        query += " ORDER BY it.date DESC, it.created_at DESC"
-
-        if 'limit' in filters:
-            query += " LIMIT ?"
-            params.append(filters['limit'])
-
-        rows = self.execute_query(query, tuple(params))
-        return [dict(row) for row in rows]
+        return conditions, params
 
     def close(self):
         """关闭数据库连接"""
-        if self.connection:
-            self.connection.close()
+        if self.pool:
+            self.disable_write_behind()
+            self.pool.close()
+            self.pool = None
+            self.connection = None
 
     def __del__(self):
         """析构函数，确保数据库连接被关闭"""
@@ -0,0 +1,96 @@
+import hashlib
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+_NON_WORD = re.compile(r'[\W_]+')
+
+def normalize_description(description: Optional[str]) -> str:
+    """规范化摘要：全角转半角、忽略大小写、去掉空白和标点"""
+    if not description:
+        return ''
+    return _NON_WORD.sub('', unicodedata.normalize('NFKC', description).lower())
+
+def description_hash(description: Optional[str]) -> str:
+    """规范化摘要的哈希"""
+    return hashlib.sha1(normalize_description(description).encode('utf-8')).hexdigest()[:16]
+
+def account_fingerprint(date: str, account_type: str, amount: float, description: Optional[str],
+                        source: Optional[str] = None, occurrence: int = 0) -> str:
+    """账目指纹：日期、收支类型、金额（分）、摘要哈希和来源的哈希
+
+    同一天同样金额和摘要的多笔交易（如两次地铁）按出现顺序 occurrence 区分，
+    重新导入重叠的流水时，同一笔交易得到的指纹不变。
+    """
+    key = '|'.join((date, account_type, str(round(amount * 100)), description_hash(description),
+                    source or '', str(occurrence)))
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+
+class FingerprintSequencer:
+    """为一个流水文件的账目行生成指纹，同一天内重复的交易依次编号
+
+    按日期分别计数并保留整个文件的计数，同一天的交易不连续（如流水未按日期排序、
+    或按账户分段导出）时编号也不会重复；内存占用与文件中不同交易的数量相关。
+    """
+
+    def __init__(self, source: Optional[str] = None):
+        self.source = source
+        self._seen: Dict[str, Dict[Tuple, int]] = {}
+
+    def fingerprint(self, date: str, account_type: str, amount: float,
+                    description: Optional[str]) -> str:
+        seen = self._seen.setdefault(date, {})
+        key = (account_type, round(amount * 100), normalize_description(description))
+        occurrence = seen.get(key, 0)
+        seen[key] = occurrence + 1
+        return account_fingerprint(date, account_type, amount, description, self.source, occurrence)
+
+def duplicate_report(db_manager, start_date: Optional[str] = None,
+                     end_date: Optional[str] = None) -> List[Dict]:
+    """查找已有账目中疑似重复的记录（日期、收支类型、金额和规范化摘要都相同）
+
+    按日期顺序读取一遍账目，每次只在内存中保留一天的数据。
+    返回每组重复的日期、类型、金额、摘要、账目id列表和数量，按日期排序。
+    """
+    conditions = ["1=1"]
+    params = []
+    if start_date:
+        conditions.append("date >= ?")
+        params.append(start_date)
+    if end_date:
+        conditions.append("date <= ?")
+        params.append(end_date)
+
+    query = f'''
+        SELECT id, date, type, amount, description
+        FROM accounts
+        WHERE {' AND '.join(conditions)}
+        ORDER BY date, id
+    '''
+
+    report = []
+    groups: Dict[Tuple, List[Dict]] = {}
+
+    def flush_day():
+        for rows in groups.values():
+            if len(rows) > 1:
+                first = rows[0]
+                report.append({
+                    'date': first['date'],
+                    'type': first['type'],
+                    'amount': first['amount'],
+                    'description': first['description'],
+                    'ids': [row['id'] for row in rows],
+                    'count': len(rows),
+                })
+        groups.clear()
+
+    current_date = None
+    for row in db_manager.iter_query(query, tuple(params)):
+        if row['date'] != current_date:
+            flush_day()
+            current_date = row['date']
+        key = (row['type'], round(row['amount'] * 100), normalize_description(row['description']))
+        groups.setdefault(key, []).append(row)
+    flush_day()
+    return report
@@ -0,0 +1,176 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional
+from ..utils.config import DB_CONFIG
+
+# 导出的数据集 -> DatabaseManager 中的逐行读取方法
+DATASETS = {
+    'accounts': 'iter_accounts',
+    'items': 'iter_items',
+    'inventory_transactions': 'iter_inventory_transactions',
+}
+
+FORMATS = ('csv', 'jsonl', 'xlsx')
+
+# Excel 单个工作表的最大行数（含表头）
+XLSX_MAX_ROWS = 1048576
+
+class DataExporter:
+    """流式导出账目、物品和库存变动
+
+    通过 iter_accounts 等方法从游标分批读取，逐行写入 CSV、JSON Lines 或 XLSX，
+    内存占用与数据总量无关。
+    筛选条件与 get_accounts / get_items / get_inventory_transactions 相同。
+
+    用法：
+        result = DataExporter(db).export('accounts', 'accounts.csv', {'start_date': '2024-01-01'})
+        print(f"{result['rows']} 行，{result['rows_per_s']:.0f} 行/秒")
+    """
+
+    def __init__(self, db_manager, batch_size: Optional[int] = None):
+        self.db = db_manager
+        self.batch_size = batch_size or DB_CONFIG.get('fetch_batch_size', 1000)
+
+    def export(self, dataset: str, path: str, filters: Optional[Dict] = None,
+               file_format: Optional[str] = None, columns: Optional[List[str]] = None,
+               progress: Optional[Callable[[int], None]] = None) -> Dict:
+        """导出数据集到文件，返回导出行数、文件大小、耗时和每秒行数
+
+        file_format 为 None 时按扩展名判断；columns 指定导出的列及顺序，默认为全部列。
+        progress(已导出行数) 在每批写入后调用。
+        """
+        if dataset not in DATASETS:
+            raise ValueError(f"未知的数据集: {dataset}")
+        file_format = (file_format or os.path.splitext(path)[1].lstrip('.')).lower()
+        if file_format not in FORMATS:
+            raise ValueError(f"不支持的导出格式: {file_format}")
+
+        start = time.perf_counter()
+        rows = getattr(self.db, DATASETS[dataset])(filters, batch_size=self.batch_size)
+        writer = getattr(self, f"_write_{file_format}")
+        count = writer(path, rows, columns, progress, dataset)
+        elapsed = time.perf_counter() - start
+
+        return {
+            'dataset': dataset,
+            'format': file_format,
+            'path': path,
+            'rows': count,
+            'bytes': os.path.getsize(path),
+            'elapsed_s': elapsed,
+            'rows_per_s': count / elapsed if elapsed > 0 else 0.0,
+        }
+
+    def _batches(self, rows: Iterator[Dict], progress: Optional[Callable[[int], None]]) -> Iterator[List[Dict]]:
+        """按 batch_size 分批，并在每批之后报告进度"""
+        count = 0
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            yield batch
+            count += len(batch)
+            if progress:
+                progress(count)
+
+    def _write_csv(self, path: str, rows: Iterator[Dict], columns: Optional[List[str]],
+                   progress, dataset: str) -> int:
+        """写入CSV（带BOM，Excel 可直接打开）"""
+        count = 0
+        with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = None
+            for batch in self._batches(rows, progress):
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=columns or list(batch[0]), extrasaction='ignore')
+                    writer.writeheader()
+                writer.writerows(batch)
+                count += len(batch)
+            if writer is None and columns:
+                csv.writer(f).writerow(columns)
+        return count
+
+    def _write_jsonl(self, path: str, rows: Iterator[Dict], columns: Optional[List[str]],
+                     progress, dataset: str) -> int:
+        """每行一个JSON对象"""
+        count = 0
+        with open(path, 'w', encoding='utf-8') as f:
+            for batch in self._batches(rows, progress):
+                for row in batch:
+                    if columns:
+                        row = {column: row.get(column) for column in columns}
+                    f.write(json.dumps(row, ensure_ascii=False))
+                    f.write('\n')
+                count += len(batch)
+        return count
+
+    def _write_xlsx(self, path: str, rows: Iterator[Dict], columns: Optional[List[str]],
+                    progress, dataset: str) -> int:
+        """写入XLSX，超过单个工作表的行数上限时续写到新的工作表
+
+        安装了 xlsxwriter 时使用其 constant_memory 模式按行写入并及时落盘，内存占用固定；
+        否则用 pandas 按批写入（openpyxl 会在内存中保留整个工作簿）。
+        pandas 按列写入单元格，与 constant_memory 要求的按行顺序不兼容，因此不能组合使用。
+        """
+        try:
+            import xlsxwriter
+        except ImportError:
+            return self._write_xlsx_pandas(path, rows, columns, progress, dataset)
+
+        count = 0
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        try:
+            worksheet = None
+            sheet_row = 0
+            for batch in self._batches(rows, progress):
+                if columns is None:
+                    columns = list(batch[0])
+                for row in batch:
+                    if worksheet is None or sheet_row >= XLSX_MAX_ROWS:
+                        worksheet = workbook.add_worksheet(self._sheet_name(dataset, len(workbook.worksheets())))
+                        worksheet.write_row(0, 0, columns)
+                        sheet_row = 1
+                    worksheet.write_row(sheet_row, 0, [row.get(column) for column in columns])
+                    sheet_row += 1
+                count += len(batch)
+
+            if worksheet is None:
+                workbook.add_worksheet(dataset).write_row(0, 0, columns or [])
+        finally:
+            workbook.close()
+        return count
+
+    def _write_xlsx_pandas(self, path: str, rows: Iterator[Dict], columns: Optional[List[str]],
+                           progress, dataset: str) -> int:
+        """用 pandas 按批写入XLSX"""
+        import pandas as pd
+
+        count = 0
+        sheet = 0
+        sheet_row = XLSX_MAX_ROWS
+        with pd.ExcelWriter(path) as writer:
+            for batch in self._batches(rows, progress):
+                frame = pd.DataFrame.from_records(batch, columns=columns)
+                while not frame.empty:
+                    if sheet_row >= XLSX_MAX_ROWS:
+                        sheet += 1
+                        sheet_row = 0
+                    # 每个工作表的第一批写入表头
+                    header = sheet_row == 0
+                    room = XLSX_MAX_ROWS - sheet_row - (1 if header else 0)
+                    part, frame = frame.iloc[:room], frame.iloc[room:]
+                    part.to_excel(writer, sheet_name=self._sheet_name(dataset, sheet - 1), index=False,
+                                  header=header, startrow=sheet_row)
+                    sheet_row += len(part) + (1 if header else 0)
+                count += len(batch)
+
+            if count == 0:
+                pd.DataFrame(columns=columns or []).to_excel(writer, sheet_name=dataset, index=False)
+        return count
+
+    @staticmethod
+    def _sheet_name(dataset: str, index: int) -> str:
+        """第一个工作表以数据集命名，之后依次加序号"""
+        return dataset if index == 0 else f"{dataset}_{index + 1}"
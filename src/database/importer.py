@@ -0,0 +1,310 @@
+import codecs
+import csv
+import io
+import math
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+from ..utils.config import DB_CONFIG
+from .dedup import FingerprintSequencer
+
+# 目标字段 -> 常见的列名，按顺序匹配表头
+DEFAULT_COLUMN_MAPPING = {
+    'date': ['日期', '交易日期', '记账日期', '交易时间', 'date'],
+    'amount': ['金额', '交易金额', '发生额', 'amount'],
+    'income': ['收入', '收入金额', '存入金额', '贷方金额'],
+    'expense': ['支出', '支出金额', '取出金额', '借方金额'],
+    'type': ['收支', '收/支', '收支类型', 'type'],
+    'description': ['摘要', '交易摘要', '备注', '用途', '商品', 'description'],
+    'category': ['分类', '类别', '交易分类', 'category'],
+}
+
+DEFAULT_DATE_FORMATS = [
+    '%Y-%m-%d',
+    '%Y/%m/%d',
+    '%Y%m%d',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y/%m/%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y/%m/%d %H:%M',
+    '%Y年%m月%d日',
+]
+
+# 收支列中表示收入或支出的取值
+TYPE_VALUES = {
+    '收入': 'income', '收': 'income', '贷': 'income', '入账': 'income', 'income': 'income', '+': 'income',
+    '支出': 'expense', '支': 'expense', '借': 'expense', '出账': 'expense', 'expense': 'expense', '-': 'expense',
+}
+
+# 只保留前若干条错误，超出部分只计数，避免大文件占用过多内存
+MAX_ERRORS = 1000
+
+class CSVImporter:
+    """银行流水CSV导入
+
+    逐行读取任意大小的CSV文件，按列映射解析日期、金额、收支类型和摘要，
+    将交易分类映射到账目分类后，按 batch_size 分批通过 add_accounts_bulk 写入。
+    整个文件在一个事务中导入，出错时整体回滚；内存中同时只保留一批数据。
+
+    每笔交易按日期、金额、摘要和来源生成指纹，通过唯一索引识别已导入过的交易，
+    重复导入重叠时间段的流水不会产生重复账目。
+
+    用法：
+        importer = CSVImporter(db, encoding='gbk', keyword_rules={'地铁': '交通'})
+        result = importer.import_file('statement.csv', progress=print)
+    """
+
+    def __init__(self, db_manager, column_mapping: Optional[Dict[str, Union[str, int, Sequence[str]]]] = None,
+                 date_formats: Optional[List[str]] = None, encoding: Optional[str] = None,
+                 category_mapping: Optional[Dict[str, str]] = None,
+                 keyword_rules: Optional[Dict[str, str]] = None,
+                 negative_is_expense: bool = True, delimiter: str = ',',
+                 skip_rows: int = 0, batch_size: Optional[int] = None,
+                 source: Optional[str] = None, duplicates: str = 'skip'):
+        """
+        column_mapping: 目标字段 -> 列名、列序号或候选列名列表，未指定的字段使用默认候选列名。
+            金额可以是一列带符号的 amount，也可以是分开的 income/expense 两列。
+        date_formats: 依次尝试的日期格式。
+        encoding: 文件编码，为 None 时自动识别 UTF-8（含BOM）和 GBK。
+        category_mapping: 文件中的分类名称 -> 账目分类名称。
+        keyword_rules: 摘要中包含的关键字 -> 账目分类名称，文件中没有分类列时使用。
+        negative_is_expense: 只有 amount 列且没有收支列时，负数是否表示支出。
+        skip_rows: 表头之前需要跳过的行数（部分银行导出的文件开头有说明文字）。
+        source: 流水来源（如银行名称），参与指纹计算并保存在账目中。
+        duplicates: 已导入过的交易如何处理：skip 跳过；flag 仍然导入（不保存指纹），
+            两种方式都会在结果中列出。
+        """
+        if duplicates not in ('skip', 'flag'):
+            raise ValueError(f"无效的重复处理方式: {duplicates}")
+        self.db = db_manager
+        self.column_mapping = dict(DEFAULT_COLUMN_MAPPING, **(column_mapping or {}))
+        self.date_formats = list(date_formats or DEFAULT_DATE_FORMATS)
+        self.encoding = encoding
+        self.category_mapping = category_mapping or {}
+        self.keyword_rules = keyword_rules or {}
+        self.negative_is_expense = negative_is_expense
+        self.delimiter = delimiter
+        self.skip_rows = skip_rows
+        self.batch_size = batch_size or DB_CONFIG.get('fetch_batch_size', 1000)
+        self.source = source
+        self.duplicates = duplicates
+
+    @staticmethod
+    def detect_encoding(path: str, sample_size: int = 65536) -> str:
+        """根据文件开头识别编码：UTF-8（含BOM）或 GBK（按其超集 GB18030 解码）"""
+        with open(path, 'rb') as f:
+            sample = f.read(sample_size)
+        if sample.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        try:
+            sample.decode('utf-8')
+            return 'utf-8'
+        except UnicodeDecodeError as e:
+            # 截断在多字节字符中间时也视为 UTF-8
+            if e.start >= len(sample) - 3 and len(sample) == sample_size:
+                return 'utf-8'
+        return 'gb18030'
+
+    def _resolve_columns(self, header: List[str]) -> Dict[str, int]:
+        """将列映射解析为列序号"""
+        names = [name.strip() for name in header]
+        columns = {}
+        for field, candidates in self.column_mapping.items():
+            if isinstance(candidates, int):
+                columns[field] = candidates
+                continue
+            if isinstance(candidates, str):
+                candidates = [candidates]
+            for candidate in candidates:
+                if candidate in names:
+                    columns[field] = names.index(candidate)
+                    break
+
+        if 'date' not in columns:
+            raise ValueError(f"找不到日期列，表头: {names}")
+        if 'amount' not in columns and not ('income' in columns or 'expense' in columns):
+            raise ValueError(f"找不到金额列，表头: {names}")
+        return columns
+
+    def _parse_date(self, value: str) -> str:
+        """按配置的格式依次尝试解析日期，上次成功的格式优先"""
+        value = value.strip()
+        for index, date_format in enumerate(self.date_formats):
+            try:
+                parsed = datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+            if index:
+                self.date_formats.insert(0, self.date_formats.pop(index))
+            return parsed.strftime('%Y-%m-%d')
+        raise ValueError(f"无法识别的日期: {value}")
+
+    @staticmethod
+    def _parse_amount(value: str) -> Optional[float]:
+        """解析金额，支持货币符号、千分位和括号表示的负数，空值返回 None"""
+        value = value.strip().replace(',', '').replace('¥', '').replace('￥', '').replace(' ', '')
+        if not value or value == '-':
+            return None
+        negative = value.startswith('(') and value.endswith(')')
+        if negative:
+            value = value[1:-1]
+        amount = float(value)
+        # float() 也接受 nan、inf 等文本，不是有效金额
+        if not math.isfinite(amount):
+            raise ValueError(f"无效的金额: {value}")
+        return -amount if negative else amount
+
+    def _build_category_lookup(self) -> Tuple[Dict[Tuple[str, str], int], Dict[str, int]]:
+        """(分类名称, 类型) -> 分类id，以及每种类型的默认分类"""
+        categories, _ = self.db.category_maps()
+        by_name = {(category['name'], category['type']): category_id
+                   for category_id, category in categories.items()}
+        defaults = {}
+        for account_type, name in (('income', '其他收入'), ('expense', '其他支出')):
+            defaults[account_type] = by_name.get((name, account_type)) or next(
+                (category_id for (_, category_type), category_id in sorted(by_name.items())
+                 if category_type == account_type), None)
+        return by_name, defaults
+
+    def _category_id(self, account_type: str, category: str, description: str,
+                     by_name: Dict[Tuple[str, str], int], defaults: Dict[str, int]) -> Optional[int]:
+        """按分类列、分类映射、摘要关键字依次确定分类，都不匹配时使用默认分类"""
+        if category:
+            name = self.category_mapping.get(category, category)
+            if (name, account_type) in by_name:
+                return by_name[(name, account_type)]
+        for keyword, name in self.keyword_rules.items():
+            if keyword in description and (name, account_type) in by_name:
+                return by_name[(name, account_type)]
+        return defaults.get(account_type)
+
+    def _parse_row(self, row: List[str], columns: Dict[str, int],
+                   by_name: Dict[Tuple[str, str], int], defaults: Dict[str, int],
+                   sequencer: FingerprintSequencer) -> Tuple:
+        """将一行CSV转换为 add_accounts_bulk 的参数元组"""
+        def cell(field: str) -> str:
+            index = columns.get(field)
+            return row[index].strip() if index is not None and index < len(row) else ''
+
+        date = self._parse_date(cell('date'))
+        account_type = TYPE_VALUES.get(cell('type').lower()) if cell('type') else None
+
+        amount = self._parse_amount(cell('amount')) if 'amount' in columns else None
+        if amount is None:
+            income = self._parse_amount(cell('income'))
+            expense = self._parse_amount(cell('expense'))
+            if income:
+                amount, account_type = income, account_type or 'income'
+            elif expense:
+                amount, account_type = expense, account_type or 'expense'
+            else:
+                raise ValueError("金额为空")
+
+        if account_type is None:
+            negative = amount < 0
+            account_type = 'expense' if negative == self.negative_is_expense else 'income'
+
+        description = cell('description')
+        category_id = self._category_id(account_type, cell('category'), description, by_name, defaults)
+        fingerprint = sequencer.fingerprint(date, account_type, abs(amount), description)
+        return (account_type, abs(amount), category_id, description, date, fingerprint, self.source)
+
+    def iter_rows(self, path: str, errors: List[Tuple[int, str]],
+                  counters: Dict[str, int]) -> Iterator[Tuple[int, Tuple]]:
+        """逐行解析文件，返回 (行号, 参数元组)，解析失败的行记入 errors"""
+        encoding = self.encoding or self.detect_encoding(path)
+        by_name, defaults = self._build_category_lookup()
+        sequencer = FingerprintSequencer(self.source)
+
+        with open(path, 'rb') as raw:
+            text = io.TextIOWrapper(raw, encoding=encoding, newline='')
+            reader = csv.reader(text, delimiter=self.delimiter)
+            for _ in range(self.skip_rows):
+                next(reader, None)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = self._resolve_columns(header)
+
+            for row in reader:
+                counters['bytes'] = raw.tell()
+                if not any(cell.strip() for cell in row):
+                    continue
+                counters['total'] += 1
+                line = reader.line_num
+                try:
+                    yield line, self._parse_row(row, columns, by_name, defaults, sequencer)
+                except (ValueError, IndexError) as e:
+                    self._add_error(errors, counters, line, str(e))
+
+    def _filter_duplicates(self, batch: List[Tuple[int, Tuple]],
+                           duplicates: List[Tuple[int, Optional[int]]],
+                           counters: Dict[str, int]) -> List[Tuple[int, Tuple]]:
+        """按指纹查找已导入过的交易，跳过或去掉指纹后保留"""
+        existing = self.db.find_account_fingerprints(row[5] for _, row in batch)
+        if not existing:
+            return batch
+
+        kept = []
+        for line, row in batch:
+            account_id = existing.get(row[5])
+            if account_id is None:
+                kept.append((line, row))
+                continue
+            counters['duplicates'] += 1
+            if len(duplicates) < MAX_ERRORS:
+                duplicates.append((line, account_id))
+            if self.duplicates == 'flag':
+                kept.append((line, row[:5] + (None, row[6])))
+        return kept
+
+    @staticmethod
+    def _add_error(errors: List[Tuple[int, str]], counters: Dict[str, int], line: int, reason: str):
+        counters['failed'] += 1
+        if len(errors) < MAX_ERRORS:
+            errors.append((line, reason))
+
+    def import_file(self, path: str,
+                    progress: Optional[Callable[[int, int, int], None]] = None) -> Dict:
+        """导入CSV文件，返回导入结果
+
+        progress(已处理行数, 已读取字节数, 文件总字节数) 在每批写入后调用。
+        结果包含 total（数据行数）、imported、failed、errors（前 MAX_ERRORS 条
+        (行号, 原因)）、duplicate_count、duplicates（前 MAX_ERRORS 条 (行号, 已有账目id)，
+        文件内部重复的行没有对应的账目id）和 elapsed_s。
+        """
+        start = time.perf_counter()
+        total_bytes = os.path.getsize(path)
+        errors: List[Tuple[int, str]] = []
+        duplicates: List[Tuple[int, Optional[int]]] = []
+        counters = {'total': 0, 'failed': 0, 'bytes': 0, 'duplicates': 0}
+        imported = 0
+
+        rows = self.iter_rows(path, errors, counters)
+        with self.db.bulk_import_mode(), self.db.transaction():
+            while True:
+                batch = [row for _, row in zip(range(self.batch_size), rows)]
+                if not batch:
+                    break
+                batch = self._filter_duplicates(batch, duplicates, counters)
+                batch_errors: List[Tuple[int, str]] = []
+                inserted = self.db.add_accounts_bulk([row for _, row in batch], batch_errors,
+                                                     skip_duplicates=True)
+                imported += inserted
+                for index, reason in batch_errors:
+                    self._add_error(errors, counters, batch[index][0], reason)
+                # 同一文件中重复出现的交易由唯一索引忽略
+                counters['duplicates'] += len(batch) - len(batch_errors) - inserted
+                if progress:
+                    progress(counters['total'], counters['bytes'], total_bytes)
+
+        return {
+            'total': counters['total'],
+            'imported': imported,
+            'failed': counters['failed'],
+            'errors': sorted(errors),
+            'duplicate_count': counters['duplicates'],
+            'duplicates': duplicates,
+            'elapsed_s': time.perf_counter() - start,
+        }
@@ -0,0 +1,129 @@
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from ..utils.config import DB_CONFIG
+
+# 记录上次维护时间的设置项
+LAST_RUN_KEY = 'last_maintenance'
+
+class DatabaseMaintenance:
+    """数据库例行维护
+
+    更新查询统计信息（PRAGMA optimize），并在 auto_vacuum=INCREMENTAL 的数据库上分批回收空闲页。
+    每批回收完成后释放写锁，维护期间界面仍可写入。建议在空闲时或后台线程中调用 run()。
+    新建的数据库默认即为增量回收模式；旧数据库需由用户显式调用一次 enable_incremental_vacuum()。
+    """
+
+    def __init__(self, db_manager, vacuum_pages: Optional[int] = None,
+                 time_budget_ms: Optional[int] = None):
+        self.db = db_manager
+        self.vacuum_pages = vacuum_pages or DB_CONFIG.get('maintenance_vacuum_pages', 1000)
+        self.time_budget_ms = time_budget_ms or DB_CONFIG.get('maintenance_time_budget_ms', 2000)
+
+    def _wal_size(self) -> int:
+        """WAL文件的大小"""
+        path = self.db.db_path + '-wal'
+        return os.path.getsize(path) if os.path.exists(path) else 0
+
+    def incremental_enabled(self) -> bool:
+        """数据库是否已是增量回收模式（auto_vacuum=INCREMENTAL）"""
+        with self.db.pool.writer() as connection:
+            return connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    def enable_incremental_vacuum(self) -> bool:
+        """将旧数据库切换为增量回收模式，返回是否执行了整库 VACUUM
+
+        切换需要执行一次 VACUUM 重建整个数据库，期间一直持有写锁，
+        因此只在用户明确要求时调用，例行维护不会调用。
+        """
+        with self.db.pool.writer() as connection:
+            if connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            connection.execute("VACUUM")
+            return True
+
+    def incremental_vacuum(self, max_pages: Optional[int] = None) -> int:
+        """分批回收空闲页，直到回收完毕、达到 max_pages 或超出时间预算，返回回收的页数"""
+        deadline = time.perf_counter() + self.time_budget_ms / 1000
+        reclaimed = 0
+        while max_pages is None or reclaimed < max_pages:
+            chunk = self.vacuum_pages
+            if max_pages is not None:
+                chunk = min(chunk, max_pages - reclaimed)
+
+            with self.db.pool.writer() as connection:
+                before = connection.execute("PRAGMA freelist_count").fetchone()[0]
+                if before == 0:
+                    break
+                connection.execute(f"PRAGMA incremental_vacuum({int(chunk)})").fetchall()
+                after = connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+            reclaimed += before - after
+            if before == after or time.perf_counter() >= deadline:
+                break
+        return reclaimed
+
+    def run(self, max_pages: Optional[int] = None) -> Dict:
+        """执行一次例行维护，返回耗时和回收空间等信息
+
+        bytes_reclaimed 为回收的空闲页大小，wal_bytes_truncated 为检查点截断的WAL文件大小，两者分开统计。
+        """
+        start = time.perf_counter()
+        result = {
+            'incremental': False,
+            'pages_reclaimed': 0,
+            'bytes_reclaimed': 0,
+            'wal_bytes_truncated': 0,
+            'freelist_remaining': 0,
+            'elapsed_ms': 0.0,
+        }
+
+        try:
+            with self.db.pool.writer() as connection:
+                # 限制每个索引的采样行数，避免大表上的 ANALYZE 耗时过长
+                connection.execute("PRAGMA analysis_limit = 400")
+                connection.execute("PRAGMA optimize")
+                page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+                result['incremental'] = connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+            # 非增量模式下 incremental_vacuum 不起作用，空闲页留待下次写入复用
+            if result['incremental']:
+                result['pages_reclaimed'] = self.incremental_vacuum(max_pages)
+                result['bytes_reclaimed'] = result['pages_reclaimed'] * page_size
+
+            with self.db.pool.writer() as connection:
+                result['freelist_remaining'] = connection.execute("PRAGMA freelist_count").fetchone()[0]
+                # WAL模式下检查点之后数据库文件才会真正缩小
+                wal_before = self._wal_size()
+                connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+                result['wal_bytes_truncated'] = max(wal_before - self._wal_size(), 0)
+
+            self.db.execute_update('''
+                INSERT OR REPLACE INTO settings (key, value, updated_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            ''', (LAST_RUN_KEY, datetime.now().isoformat(timespec='seconds')))
+        except Exception as e:
+            print(f"数据库维护失败: {e}")
+
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        return result
+
+    def last_run(self) -> Optional[datetime]:
+        """上次维护的时间，从未维护时返回 None"""
+        rows = self.db.execute_query("SELECT value FROM settings WHERE key = ?", (LAST_RUN_KEY,))
+        if not rows or not rows[0]['value']:
+            return None
+        try:
+            return datetime.fromisoformat(rows[0]['value'])
+        except ValueError:
+            return None
+
+    def is_due(self) -> bool:
+        """距上次维护是否已超过 maintenance_interval_hours"""
+        last_run = self.last_run()
+        if last_run is None:
+            return True
+        interval = timedelta(hours=DB_CONFIG.get('maintenance_interval_hours', 24))
+        return datetime.now() - last_run >= interval
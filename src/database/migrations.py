@@ -0,0 +1,356 @@
+import sqlite3
+from typing import Callable, List, Tuple
+from ..utils.config import DEFAULT_CATEGORIES, DEFAULT_INVENTORY_CATEGORIES
+
+# 已注册的迁移：(版本号, 说明, 迁移函数)，版本号从1开始连续递增
+MIGRATIONS: List[Tuple[int, str, Callable[[sqlite3.Cursor], None]]] = []
+
+def migration(version: int, description: str):
+    """注册迁移步骤的装饰器"""
+    def decorator(func):
+        MIGRATIONS.append((version, description, func))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return func
+    return decorator
+
+def latest_version() -> int:
+    """获取最新的数据库结构版本"""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+def get_schema_version(connection: sqlite3.Connection) -> int:
+    """读取数据库当前的结构版本"""
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(connection: sqlite3.Connection) -> int:
+    """执行所有未完成的迁移，返回迁移后的版本号
+
+    已是最新版本的数据库只需读取一次 PRAGMA user_version。
+    每个迁移在独立事务中执行，并与版本号一起提交，失败时回滚该步骤。
+    """
+    current = get_schema_version(connection)
+    if current >= latest_version():
+        return current
+
+    for version, description, func in MIGRATIONS:
+        if version <= current:
+            continue
+
+        cursor = connection.cursor()
+        try:
+            cursor.execute("BEGIN")
+            func(cursor)
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            connection.commit()
+        except Exception as e:
+            connection.rollback()
+            raise RuntimeError(f"数据库迁移到版本 {version}（{description}）失败: {e}") from e
+
+        current = version
+
+    return current
+
+def fts5_available(cursor: sqlite3.Cursor, tokenizer: str = 'unicode61') -> bool:
+    """检测当前SQLite是否支持FTS5及指定的分词器"""
+    try:
+        cursor.execute(f"CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='{tokenizer}')")
+        cursor.execute("DROP TABLE temp._fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+# ========== 迁移步骤 ==========
+@migration(1, '创建基础表结构并插入默认数据')
+def _create_base_schema(cursor: sqlite3.Cursor):
+    # 新数据库在建表前启用增量回收，例行维护无需整库 VACUUM；
+    # 连接已切换为WAL时此设置不生效，由连接参数中 auto_vacuum 先于 journal_mode 设置保证
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
+    # 创建分类表
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+            color TEXT DEFAULT '#1890ff',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # 创建账目表
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS accounts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT NOT NULL CHECK (type IN ('income', 'expense')),
+            amount REAL NOT NULL CHECK (amount > 0),
+            category_id INTEGER NOT NULL,
+            description TEXT,
+            date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (category_id) REFERENCES categories (id)
+        )
+    ''')
+
+    # 创建物品类别表
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS item_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # 创建物品表
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            category_id INTEGER,
+            quantity REAL DEFAULT 0,
+            unit TEXT DEFAULT '个',
+            unit_price REAL DEFAULT 0,
+            min_quantity REAL DEFAULT 0,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (category_id) REFERENCES item_categories (id)
+        )
+    ''')
+
+    # 创建库存变动记录表
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS inventory_transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL,
+            type TEXT NOT NULL CHECK (type IN ('in', 'out')),
+            quantity REAL NOT NULL,
+            unit_price REAL DEFAULT 0,
+            reason TEXT,
+            date DATE NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (item_id) REFERENCES items (id)
+        )
+    ''')
+
+    # 创建设置表
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # 插入默认分类
+    cursor.executemany('''
+        INSERT OR IGNORE INTO categories (name, type, color)
+        VALUES (?, ?, ?)
+    ''', [
+        (category['name'], category_type, category['color'])
+        for category_type, categories in DEFAULT_CATEGORIES.items()
+        for category in categories
+    ])
+
+    # 插入默认物品分类
+    cursor.executemany('''
+        INSERT OR IGNORE INTO item_categories (name, description)
+        VALUES (?, ?)
+    ''', [
+        (category['name'], category['description'])
+        for category in DEFAULT_INVENTORY_CATEGORIES
+    ])
+
+@migration(2, '创建查询索引')
+def _create_indexes(cursor: sqlite3.Cursor):
+    # 账目列表按日期排序及日期范围筛选
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_date ON accounts (date, created_at)")
+    # 分类汇总：按分类关联并筛选日期，包含金额列以覆盖查询
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_category_date ON accounts (category_id, date, amount)")
+    # 收支汇总：按类型分组并筛选日期，包含金额列以覆盖查询
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_type_date ON accounts (type, date, amount)")
+    # 物品按类别筛选
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_category ON items (category_id)")
+    # 库存变动按物品查询
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_transactions_item_date ON inventory_transactions (item_id, date)")
+    # 库存变动按日期排序及日期范围筛选
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_inventory_transactions_date ON inventory_transactions (date, created_at)")
+
+    # 更新统计信息，让查询优化器选用新索引
+    cursor.execute("ANALYZE")
+
+@migration(3, '创建账目全文索引')
+def _create_accounts_fts(cursor: sqlite3.Cursor):
+    # trigram 分词器（SQLite 3.34+）按三字组切分，中文无需分词即可做子串匹配；
+    # 不支持时跳过，关键字搜索退回 LIKE 查询
+    if not fts5_available(cursor, 'trigram'):
+        return
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS accounts_fts
+        USING fts5(description, category_name, tokenize='trigram')
+    ''')
+
+    # 通过触发器与账目表保持同步，rowid 即账目 id
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_insert AFTER INSERT ON accounts
+        BEGIN
+            INSERT INTO accounts_fts (rowid, description, category_name)
+            VALUES (new.id, new.description,
+                    (SELECT name FROM categories WHERE id = new.category_id));
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_delete AFTER DELETE ON accounts
+        BEGIN
+            DELETE FROM accounts_fts WHERE rowid = old.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_update
+        AFTER UPDATE OF description, category_id ON accounts
+        BEGIN
+            UPDATE accounts_fts
+            SET description = new.description,
+                category_name = (SELECT name FROM categories WHERE id = new.category_id)
+            WHERE rowid = new.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS accounts_fts_category_update
+        AFTER UPDATE OF name ON categories
+        BEGIN
+            UPDATE accounts_fts SET category_name = new.name
+            WHERE rowid IN (SELECT id FROM accounts WHERE category_id = new.id);
+        END
+    ''')
+
+    # 为已有账目建立索引
+    cursor.execute('''
+        INSERT INTO accounts_fts (rowid, description, category_name)
+        SELECT a.id, a.description, c.name
+        FROM accounts a
+        LEFT JOIN categories c ON a.category_id = c.id
+    ''')
+
+@migration(4, '创建物品全文索引')
+def _create_items_fts(cursor: sqlite3.Cursor):
+    # unicode61 分词器配合前缀索引，输入一两个字即可按前缀匹配（连续的中文视为一个词）
+    if not fts5_available(cursor):
+        return
+
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS items_fts
+        USING fts5(name, description, category_name, tokenize='unicode61', prefix='1 2 3')
+    ''')
+
+    # 通过触发器与物品表保持同步，rowid 即物品 id
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS items_fts_insert AFTER INSERT ON items
+        BEGIN
+            INSERT INTO items_fts (rowid, name, description, category_name)
+            VALUES (new.id, new.name, new.description,
+                    (SELECT name FROM item_categories WHERE id = new.category_id));
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS items_fts_delete AFTER DELETE ON items
+        BEGIN
+            DELETE FROM items_fts WHERE rowid = old.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS items_fts_update
+        AFTER UPDATE OF name, description, category_id ON items
+        BEGIN
+            UPDATE items_fts
+            SET name = new.name,
+                description = new.description,
+                category_name = (SELECT name FROM item_categories WHERE id = new.category_id)
+            WHERE rowid = new.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS items_fts_category_update
+        AFTER UPDATE OF name ON item_categories
+        BEGIN
+            UPDATE items_fts SET category_name = new.name
+            WHERE rowid IN (SELECT id FROM items WHERE category_id = new.id);
+        END
+    ''')
+
+    # 为已有物品建立索引
+    cursor.execute('''
+        INSERT INTO items_fts (rowid, name, description, category_name)
+        SELECT i.id, i.name, i.description, ic.name
+        FROM items i
+        LEFT JOIN item_categories ic ON i.category_id = ic.id
+    ''')
+
+@migration(5, '创建按月分类汇总表')
+def _create_monthly_category_totals(cursor: sqlite3.Cursor):
+    # 每月每个分类的收支合计，由账目表上的触发器实时维护
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS monthly_category_totals (
+            month TEXT NOT NULL,
+            category_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            total REAL NOT NULL DEFAULT 0,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (month, category_id, type)
+        ) WITHOUT ROWID
+    ''')
+
+    add_new = '''
+        INSERT INTO monthly_category_totals (month, category_id, type, total, count)
+        VALUES (substr(new.date, 1, 7), new.category_id, new.type, new.amount, 1)
+        ON CONFLICT (month, category_id, type)
+        DO UPDATE SET total = total + excluded.total, count = count + 1;
+    '''
+    remove_old = '''
+        UPDATE monthly_category_totals
+        SET total = total - old.amount, count = count - 1
+        WHERE month = substr(old.date, 1, 7) AND category_id = old.category_id AND type = old.type;
+        DELETE FROM monthly_category_totals
+        WHERE month = substr(old.date, 1, 7) AND category_id = old.category_id AND type = old.type
+          AND count <= 0;
+    '''
+
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS monthly_totals_insert AFTER INSERT ON accounts
+        BEGIN
+            {add_new}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS monthly_totals_delete AFTER DELETE ON accounts
+        BEGIN
+            {remove_old}
+        END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS monthly_totals_update
+        AFTER UPDATE OF type, amount, category_id, date ON accounts
+        BEGIN
+            {remove_old}
+            {add_new}
+        END
+    ''')
+
+    # 汇总已有账目
+    cursor.execute('''
+        INSERT OR REPLACE INTO monthly_category_totals (month, category_id, type, total, count)
+        SELECT substr(date, 1, 7), category_id, type, SUM(amount), COUNT(*)
+        FROM accounts
+        GROUP BY substr(date, 1, 7), category_id, type
+    ''')
+
+@migration(6, '账目增加指纹和来源列，用于导入去重')
+def _add_account_fingerprint(cursor: sqlite3.Cursor):
+    # 指纹只在导入时生成，手工录入的账目为空；已有账目可能本就重复，不回填
+    cursor.execute("ALTER TABLE accounts ADD COLUMN fingerprint TEXT")
+    cursor.execute("ALTER TABLE accounts ADD COLUMN source TEXT")
+    cursor.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_accounts_fingerprint
+        ON accounts (fingerprint) WHERE fingerprint IS NOT NULL
+    ''')
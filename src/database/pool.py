@@ -0,0 +1,108 @@
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from .connection import open_connection
+
+class ConnectionPool:
+    """数据库连接池
+
+    每个线程（包括GUI线程）获得独立的只读连接，所有写操作共用一个写连接，
+    由可重入锁串行化。读连接只能看到已提交的数据，不会读到其他线程进行中的事务；
+    事务块内读取本事务尚未提交的修改由 DatabaseManager._reader() 处理。
+
+    线程结束时应调用 release_reader()（或 release_current_thread()）关闭其只读连接；
+    打开新连接时也会关闭所属线程已结束的连接。
+    """
+
+    # 所有未被回收的连接池，供 release_current_thread() 使用
+    _instances = weakref.WeakSet()
+
+    def __init__(self, db_path: str, pragmas: Optional[Dict[str, Any]] = None):
+        self.db_path = db_path
+        self.pragmas = pragmas
+        self.write_lock = threading.RLock()
+        self.writer_connection = open_connection(db_path, pragmas, check_same_thread=False)
+
+        # 内存数据库无法被多个连接共享，只能全部使用写连接
+        self._shared_only = db_path == ':memory:' or db_path.startswith('file::memory:')
+        self._local = threading.local()
+        # 只读连接 -> 所属线程
+        self._readers: Dict[sqlite3.Connection, threading.Thread] = {}
+        self._readers_lock = threading.Lock()
+        ConnectionPool._instances.add(self)
+
+    def reader(self) -> sqlite3.Connection:
+        """获取当前线程的只读连接"""
+        if self._shared_only:
+            return self.writer_connection
+
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            self._close_orphaned_readers()
+            # 允许其他线程调用 close() 统一关闭，但连接只在本线程内使用
+            connection = open_connection(self.db_path, self.pragmas, check_same_thread=False)
+            connection.execute("PRAGMA query_only = 1")
+            self._local.connection = connection
+            with self._readers_lock:
+                self._readers[connection] = threading.current_thread()
+        return connection
+
+    def _close_orphaned_readers(self):
+        """关闭所属线程已结束的只读连接
+
+        非 Python 创建的线程（如Qt线程池的线程）无法判断是否结束，需要自行调用 release_reader()。
+        """
+        with self._readers_lock:
+            orphaned = [connection for connection, thread in self._readers.items()
+                        if not thread.is_alive()]
+            for connection in orphaned:
+                del self._readers[connection]
+        for connection in orphaned:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+
+    @contextmanager
+    def writer(self):
+        """独占写连接，同一时间只有一个线程可以写入"""
+        with self.write_lock:
+            self._local.write_depth = getattr(self._local, 'write_depth', 0) + 1
+            try:
+                yield self.writer_connection
+            finally:
+                self._local.write_depth -= 1
+
+    def owns_writer(self) -> bool:
+        """当前线程是否正在使用写连接（写操作、事务或批量导入期间）"""
+        return getattr(self._local, 'write_depth', 0) > 0
+
+    def release_reader(self):
+        """关闭当前线程的只读连接（线程结束前调用）"""
+        connection = getattr(self._local, 'connection', None)
+        if connection is not None:
+            self._local.connection = None
+            with self._readers_lock:
+                self._readers.pop(connection, None)
+            connection.close()
+
+    @classmethod
+    def release_current_thread(cls):
+        """关闭当前线程在所有连接池中的只读连接（后台任务结束时调用）"""
+        for pool in list(cls._instances):
+            pool.release_reader()
+
+    def close(self):
+        """关闭所有连接"""
+        with self._readers_lock:
+            readers, self._readers = list(self._readers), {}
+        for connection in readers:
+            try:
+                connection.close()
+            except sqlite3.Error:
+                pass
+
+        with self.write_lock:
+            self.writer_connection.close()
@@ -0,0 +1,159 @@
+import contextlib
+import json
+import os
+import sys
+import threading
+from collections import deque
+from types import CodeType
+from typing import Dict, List, Optional
+
+# 直方图各区间的上限（毫秒），最后一个区间为无上限
+HISTOGRAM_BUCKETS_MS = (1, 5, 10, 50, 100, 500, 1000, 5000)
+
+# 这些方法只是执行语句的入口，统计时标记为调用它们的方法
+_ENTRY_POINTS = {'execute_query', 'iter_query', 'execute_update', 'execute_insert', 'transaction'}
+
+# 本模块所在目录，以及 with 语句经过的 contextlib 模块
+_HERE = os.path.dirname(os.path.abspath(__file__))
+_CONTEXTLIB = os.path.abspath(contextlib.__file__)
+
+# 代码对象 -> 统计标签，内部方法为空字符串；每个代码对象只解析一次路径
+_labels: Dict[CodeType, str] = {}
+
+def _label_of(code: CodeType) -> str:
+    """代码对象对应的统计标签，内部方法返回空字符串"""
+    label = _labels.get(code)
+    if label is None:
+        path = os.path.abspath(code.co_filename)
+        internal = path == _CONTEXTLIB or os.path.dirname(path) == _HERE and (
+            code.co_name in _ENTRY_POINTS or code.co_name.startswith('_')
+            or code.co_filename == __file__)
+        if internal:
+            label = ''
+        else:
+            # 生成器表达式等局部函数归到外层方法
+            label = getattr(code, 'co_qualname', code.co_name).split('.<locals>')[0]
+        _labels[code] = label
+    return label
+
+class QueryProfiler:
+    """查询耗时统计
+
+    按调用方法（如 DatabaseManager.get_accounts）汇总执行次数、返回行数和耗时直方图；
+    耗时超过 slow_query_ms 的语句连同查询计划（EXPLAIN QUERY PLAN）一起输出，
+    并保留最近的 max_slow_queries 条。
+    """
+
+    def __init__(self, slow_query_ms: Optional[float] = None, enabled: bool = True,
+                 max_slow_queries: int = 100):
+        self.slow_query_ms = slow_query_ms
+        self.enabled = enabled
+        self._stats: Dict[str, Dict] = {}
+        self._slow_queries = deque(maxlen=max_slow_queries)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def call_site() -> str:
+        """查找执行语句的业务方法，跳过本模块、DatabaseManager 的内部方法和 contextlib"""
+        frame = sys._getframe(1)
+        while frame is not None:
+            label = _label_of(frame.f_code)
+            if label:
+                return label
+            frame = frame.f_back
+        return '<unknown>'
+
+    def record(self, query: str, params: tuple, elapsed_ms: float, rows: int,
+               connection=None, label: Optional[str] = None):
+        """记录一次语句执行；connection 用于为慢查询获取查询计划"""
+        if not self.enabled:
+            return
+        label = label or self.call_site()
+        bucket = next((i for i, limit in enumerate(HISTOGRAM_BUCKETS_MS) if elapsed_ms <= limit),
+                      len(HISTOGRAM_BUCKETS_MS))
+
+        with self._lock:
+            stats = self._stats.get(label)
+            if stats is None:
+                stats = self._stats[label] = {
+                    'count': 0,
+                    'rows': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'histogram': [0] * (len(HISTOGRAM_BUCKETS_MS) + 1),
+                }
+            stats['count'] += 1
+            stats['rows'] += rows
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['histogram'][bucket] += 1
+
+        if self.slow_query_ms is not None and elapsed_ms >= self.slow_query_ms:
+            self._log_slow_query(label, query, params, elapsed_ms, rows, connection)
+
+    def _log_slow_query(self, label: str, query: str, params: tuple, elapsed_ms: float,
+                        rows: int, connection):
+        """输出慢查询及其查询计划"""
+        plan = self.explain(connection, query, params) if connection is not None else []
+        sql = ' '.join(query.split())
+        with self._lock:
+            self._slow_queries.append({
+                'label': label,
+                'sql': sql,
+                'elapsed_ms': round(elapsed_ms, 3),
+                'rows': rows,
+                'plan': plan,
+            })
+
+        print(f"慢查询 {elapsed_ms:.1f}ms [{label}] 行数 {rows}: {sql}")
+        for line in plan:
+            print(f"    {line}")
+
+    @staticmethod
+    def explain(connection, query: str, params: tuple = ()) -> List[str]:
+        """获取语句的查询计划，每个节点一行并按层级缩进"""
+        try:
+            rows = connection.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()
+        except Exception as e:
+            return [f"无法获取查询计划: {e}"]
+
+        depth = {0: -1}
+        plan = []
+        for node_id, parent_id, _, detail in rows:
+            depth[node_id] = depth.get(parent_id, -1) + 1
+            plan.append('  ' * depth[node_id] + detail)
+        return plan
+
+    def stats(self) -> Dict[str, Dict]:
+        """按调用方法汇总的统计信息"""
+        with self._lock:
+            result = {}
+            for label, stats in self._stats.items():
+                result[label] = dict(stats, histogram=list(stats['histogram']),
+                                     mean_ms=stats['total_ms'] / stats['count'])
+            return result
+
+    def slow_queries(self) -> List[Dict]:
+        """最近的慢查询"""
+        with self._lock:
+            return list(self._slow_queries)
+
+    def reset(self):
+        """清空统计信息"""
+        with self._lock:
+            self._stats.clear()
+            self._slow_queries.clear()
+
+    def to_json(self, path: Optional[str] = None) -> str:
+        """导出统计信息为JSON，指定 path 时同时写入文件"""
+        data = {
+            'slow_query_ms': self.slow_query_ms,
+            'histogram_buckets_ms': list(HISTOGRAM_BUCKETS_MS) + [None],
+            'queries': self.stats(),
+            'slow_queries': self.slow_queries(),
+        }
+        text = json.dumps(data, ensure_ascii=False, indent=2)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        return text
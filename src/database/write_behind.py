@@ -0,0 +1,102 @@
+import threading
+from typing import Dict, List, Optional, Tuple
+
+class WriteBehindQueue:
+    """账目延迟写入队列
+
+    界面连续录入账目时，新账目先进入内存队列并立即返回一个临时 id（负数），
+    每隔 flush_interval_ms 毫秒或积累 max_rows 条后在一个事务中批量写入。
+    写入后可通过 resolve_id() 查到临时 id 对应的真实 id。
+    程序退出前必须调用 flush()，DatabaseManager.close() 也会自动调用。
+    """
+
+    def __init__(self, db_manager, flush_interval_ms: int = 500, max_rows: int = 50):
+        self.db = db_manager
+        self.flush_interval_ms = flush_interval_ms
+        self.max_rows = max_rows
+        self._pending: List[Tuple[int, Tuple]] = []
+        self._resolved: Dict[int, int] = {}
+        self._next_id = -1
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def pending(self) -> int:
+        """等待写入的账目数"""
+        return len(self._pending)
+
+    def add_account(self, row: Tuple) -> int:
+        """加入队列并返回临时 id，row 为 add_account 的参数元组"""
+        with self._lock:
+            provisional_id = self._next_id
+            self._next_id -= 1
+            self._pending.append((provisional_id, row))
+            full = len(self._pending) >= self.max_rows
+            self._schedule()
+
+        if full:
+            # 写连接被占用时不等待，交给定时器写入，避免阻塞界面
+            self.flush(blocking=False)
+        return provisional_id
+
+    def _schedule(self):
+        """队列非空且没有定时器时启动定时写入（调用方持有 _lock）"""
+        if self._pending and self._timer is None:
+            self._timer = threading.Timer(self.flush_interval_ms / 1000, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self, blocking: bool = True) -> int:
+        """把队列中的账目在一个事务中写入数据库，返回写入的条数
+
+        单条写入失败只回滚该条（SAVEPOINT），不影响同批次的其他账目。
+        先取得写锁再取出队列，与其他写操作的加锁顺序一致。
+        当前线程已在使用写连接（事务或批量导入中）时不写入，
+        以免队列中的账目成为调用方事务的一部分、随其回滚；
+        blocking 为 False 时，写连接正被其他线程占用也不等待。
+        未写入的账目留在队列中，由定时器稍后写入。
+        """
+        pool = self.db.pool
+        # 数据库已关闭（close() 时已写入剩余账目）
+        if pool is None or pool.owns_writer() or not pool.write_lock.acquire(blocking):
+            return 0
+        try:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            if not batch:
+                return 0
+
+            resolved = {}
+            try:
+                with self.db.transaction():
+                    for provisional_id, row in batch:
+                        try:
+                            with self.db.transaction():
+                                resolved[provisional_id] = self.db._insert_account(*row)
+                        except Exception as e:
+                            print(f"延迟写入账目失败: {e}")
+            except Exception as e:
+                # 提交失败时整批放回队列，稍后重试
+                print(f"延迟写入账目失败: {e}")
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._schedule()
+                return 0
+
+            # 提交成功后才记录真实 id
+            self._resolved.update(resolved)
+            return len(resolved)
+        finally:
+            pool.write_lock.release()
+
+    def resolve_id(self, provisional_id: int) -> Optional[int]:
+        """查询临时 id 对应的真实 id，尚未写入或写入失败时返回 None"""
+        return self._resolved.get(provisional_id)
+
+    def close(self):
+        """写入剩余账目并停止定时器"""
+        self.flush()
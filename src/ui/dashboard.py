@@ -11,6 +11,8 @@ import matplotlib.dates as mdates
 from datetime import datetime, date, timedelta
 import sys
 
+from .workers import run_in_background
+
 class StatisticCard(QFrame):
     """统计卡片"""
     def __init__(self, title: str, value: str, subtitle: str = "", color: str = "#1890ff", icon: str = "📊"):
@@ -485,23 +487,41 @@ class DashboardWidget(QWidget):
         parent_layout.addLayout(cards_layout)
 
     def load_data(self):
-        """加载数据"""
-        try:
-            # 计算本月统计
-            today = date.today()
-            first_day = today.replace(day=1)
-            end_day = today
-
-            # 获取本月账目汇总
-            summaries = self.db_manager.get_account_summary(
+        """加载数据（在后台线程查询，完成后回到界面线程更新）"""
+        run_in_background(
+            self.fetch_data,
+            on_finished=self.update_data,
+            on_error=lambda message: print(f"加载数据失败: {message}")
+        )
+
+    def fetch_data(self):
+        """查询总览数据，在工作线程中执行"""
+        # 计算本月统计
+        today = date.today()
+        first_day = today.replace(day=1)
+        end_day = today
+
+        return {
+            # 本月账目汇总
+            'summaries': self.db_manager.get_account_summary(
                 first_day.strftime('%Y-%m-%d'),
                 end_day.strftime('%Y-%m-%d')
-            )
-
+            ),
+            # 物品列表
+            'items': self.db_manager.get_items(),
+            # 最近账目
+            'recent_accounts': self.db_manager.get_accounts({'limit': 10}),
+            # 库存预警物品
+            'low_stock_items': self.db_manager.get_items({'low_stock': True}),
+        }
+
+    def update_data(self, data):
+        """用查询结果更新界面"""
+        try:
             income_total = 0
             expense_total = 0
 
-            for summary in summaries:
+            for summary in data['summaries']:
                 if summary['type'] == 'income':
                     income_total = summary['total']
                 elif summary['type'] == 'expense':
@@ -515,21 +535,16 @@ class DashboardWidget(QWidget):
             self.balance_card.findChild(QLabel).setText(f"￥{balance:.2f}")
 
             # 获取物品数量
-            items = self.db_manager.get_items()
-            item_count = len(items)
+            item_count = len(data['items'])
             self.inventory_card.findChild(QLabel).setText(str(item_count))
 
-            # 获取最近账目
-            recent_accounts = self.db_manager.get_accounts({'limit': 10})
             # 重新创建最近账目部件
             self.recent_accounts_widget.deleteLater()
-            self.recent_accounts_widget = RecentAccountWidget(recent_accounts)
+            self.recent_accounts_widget = RecentAccountWidget(data['recent_accounts'])
 
-            # 获取库存预警物品
-            low_stock_items = self.db_manager.get_items({'low_stock': True})
             # 重新创建库存预警部件
             self.low_stock_widget.deleteLater()
-            self.low_stock_widget = LowStockWidget(low_stock_items)
+            self.low_stock_widget = LowStockWidget(data['low_stock_items'])
 
             # 更新布局
             # 这里需要重新添加到布局中，简化起见这里不展示具体实现
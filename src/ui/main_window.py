@@ -2,17 +2,22 @@ import sys
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QFrame, QSplitter, QMenuBar, QStatusBar,
-    QMessageBox, QApplication
+    QMessageBox, QApplication, QFileDialog
 )
-from PyQt6.QtCore import Qt, QSize, pyqtSignal
+from PyQt6.QtCore import Qt, QSize, QThreadPool, QTimer, pyqtSignal
 from PyQt6.QtGui import QIcon, QFont, QAction, QPixmap
 
 from .dashboard import DashboardWidget
 from .account import AccountWidget
 from .inventory import InventoryWidget
 from .statistics import StatisticsWidget
+from .workers import run_in_background
 from ..database.database import DatabaseManager
-from ..utils.config import APP_CONFIG, COLORS
+from ..database.backup import BackupManager
+from ..database.maintenance import DatabaseMaintenance
+from ..database.importer import CSVImporter
+from ..database.exporter import DataExporter
+from ..utils.config import APP_CONFIG, COLORS, DB_CONFIG
 
 class NavigationButton(QPushButton):
     """导航按钮"""
@@ -133,16 +138,24 @@ class SidebarWidget(QFrame):
 
 class MainWindow(QMainWindow):
     """主窗口"""
+    # 退出备份进度（剩余页数, 总页数），从后台线程发出
+    backup_progress = pyqtSignal(int, int)
 
     def __init__(self):
         super().__init__()
         self.db_manager = DatabaseManager()
+        # 退出备份状态：None 未开始，'running' 进行中，'done' 已结束
+        self.exit_backup_state = None
+        if DB_CONFIG.get('write_behind'):
+            self.db_manager.enable_write_behind()
         self.current_page = 'dashboard'
 
         self.setup_ui()
         self.setup_menu()
         self.setup_statusbar()
         self.connect_signals()
+        self.setup_maintenance()
+        self.setup_backup()
 
         # 显示总览页面
         self.switch_page('dashboard')
@@ -231,6 +244,30 @@ class MainWindow(QMainWindow):
 
         file_menu.addSeparator()
 
+        import_action = QAction('导入银行流水(&M)...', self)
+        import_action.triggered.connect(self.import_accounts)
+        file_menu.addAction(import_action)
+
+        export_action = QAction('导出账目(&E)...', self)
+        export_action.triggered.connect(self.export_accounts)
+        file_menu.addAction(export_action)
+
+        file_menu.addSeparator()
+
+        backup_action = QAction('备份数据库(&B)', self)
+        backup_action.triggered.connect(self.backup_now)
+        file_menu.addAction(backup_action)
+
+        restore_action = QAction('从备份恢复(&R)...', self)
+        restore_action.triggered.connect(self.restore_from_backup)
+        file_menu.addAction(restore_action)
+
+        compact_action = QAction('压缩数据库(&C)...', self)
+        compact_action.triggered.connect(self.compact_database)
+        file_menu.addAction(compact_action)
+
+        file_menu.addSeparator()
+
         exit_action = QAction('退出(&X)', self)
         exit_action.setShortcut('Ctrl+Q')
         exit_action.triggered.connect(self.close)
@@ -277,6 +314,64 @@ class MainWindow(QMainWindow):
     def connect_signals(self):
         """连接信号槽"""
         self.sidebar.page_changed.connect(self.switch_page)
+        self.backup_progress.connect(self.on_backup_progress)
+
+    def setup_maintenance(self):
+        """定时检查是否需要数据库维护"""
+        self.maintenance = DatabaseMaintenance(self.db_manager)
+        self.maintenance_running = False
+        self.maintenance_timer = QTimer(self)
+        self.maintenance_timer.timeout.connect(self.run_maintenance)
+        if DB_CONFIG.get('maintenance_interval_hours'):
+            self.maintenance_timer.start(DB_CONFIG.get('maintenance_idle_delay_ms', 60000))
+
+    def run_maintenance(self):
+        """到期后在后台线程执行数据库维护"""
+        if self.maintenance_running or not self.maintenance.is_due():
+            return
+        self.maintenance_running = True
+        run_in_background(self.maintenance.run,
+                          on_finished=self.on_maintenance_finished,
+                          on_error=self.on_maintenance_error)
+
+    def on_maintenance_finished(self, result):
+        """维护完成"""
+        self.maintenance_running = False
+        self.status_bar.showMessage(
+            f"数据库维护完成，回收空闲页 {result['bytes_reclaimed'] / 1024:.0f} KB，"
+            f"截断WAL {result['wal_bytes_truncated'] / 1024:.0f} KB，"
+            f"耗时 {result['elapsed_ms']:.0f} 毫秒", 5000)
+
+    def on_maintenance_error(self, message):
+        """维护失败"""
+        self.maintenance_running = False
+        print(f"数据库维护失败: {message}")
+
+    def compact_database(self):
+        """将旧数据库切换为增量回收模式（整库 VACUUM），只在用户确认后执行"""
+        if self.maintenance_running:
+            self.status_bar.showMessage("正在维护数据库，请稍候...", 3000)
+            return
+        if self.maintenance.incremental_enabled():
+            self.status_bar.showMessage("数据库已启用增量回收，例行维护会自动回收空间", 5000)
+            return
+        answer = QMessageBox.question(
+            self, '压缩数据库',
+            "将重建整个数据库并启用增量回收，数据较多时可能需要较长时间，期间无法保存修改。确定要继续吗？")
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+
+        self.maintenance_running = True
+        self.db_manager.flush()
+        self.status_bar.showMessage("正在压缩数据库...")
+        run_in_background(self.maintenance.enable_incremental_vacuum,
+                          on_finished=self.on_compact_finished,
+                          on_error=self.on_maintenance_error)
+
+    def on_compact_finished(self, vacuumed):
+        """压缩完成"""
+        self.maintenance_running = False
+        self.status_bar.showMessage("数据库压缩完成，已启用增量回收", 5000)
 
     def switch_page(self, page_id):
         """切换页面"""
@@ -312,6 +407,47 @@ class MainWindow(QMainWindow):
         # 更新状态栏
         self.status_bar.showMessage(f"当前页面: {self.page_title.text()}")
 
+    def import_accounts(self):
+        """选择CSV文件并在后台导入账目"""
+        path, _ = QFileDialog.getOpenFileName(self, '导入银行流水', '', 'CSV 文件 (*.csv);;所有文件 (*)')
+        if not path:
+            return
+
+        self.status_bar.showMessage("正在导入银行流水...")
+        importer = CSVImporter(self.db_manager)
+        run_in_background(importer.import_file, path,
+                          on_finished=self.on_import_finished,
+                          on_error=lambda message: QMessageBox.warning(self, '导入失败', message))
+
+    def on_import_finished(self, result):
+        """导入完成后显示结果并刷新当前页面"""
+        message = (f"共 {result['total']} 行，成功导入 {result['imported']} 条，"
+                   f"重复跳过 {result['duplicate_count']} 条，失败 {result['failed']} 条，"
+                   f"耗时 {result['elapsed_s']:.1f} 秒")
+        self.status_bar.showMessage(message, 5000)
+        details = '\n'.join(f"第 {line} 行: {reason}" for line, reason in result['errors'][:10])
+        QMessageBox.information(self, '导入完成', message + ('\n\n' + details if details else ''))
+        self.switch_page(self.current_page)
+
+    def export_accounts(self):
+        """选择导出文件并在后台导出全部账目"""
+        path, _ = QFileDialog.getSaveFileName(
+            self, '导出账目', 'accounts.csv',
+            'CSV 文件 (*.csv);;Excel 文件 (*.xlsx);;JSON Lines 文件 (*.jsonl)')
+        if not path:
+            return
+
+        self.status_bar.showMessage("正在导出账目...")
+        run_in_background(DataExporter(self.db_manager).export, 'accounts', path,
+                          on_finished=self.on_export_finished,
+                          on_error=lambda message: QMessageBox.warning(self, '导出失败', message))
+
+    def on_export_finished(self, result):
+        """导出完成"""
+        self.status_bar.showMessage(
+            f"已导出 {result['rows']} 条账目到 {result['path']}，"
+            f"耗时 {result['elapsed_s']:.1f} 秒（{result['rows_per_s']:.0f} 条/秒）", 5000)
+
     def show_about(self):
         """显示关于对话框"""
         about_text = f"""
@@ -326,10 +462,114 @@ class MainWindow(QMainWindow):
 
         QMessageBox.about(self, f"关于 {APP_CONFIG['app_name']}", about_text)
 
+    def setup_backup(self):
+        """定时检查是否需要自动备份"""
+        self.backup_manager = BackupManager(self.db_manager)
+        self.backup_running = False
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(self.run_scheduled_backup)
+        if DB_CONFIG.get('backup_interval_hours'):
+            self.backup_timer.start(DB_CONFIG.get('maintenance_idle_delay_ms', 60000))
+
+    def run_scheduled_backup(self):
+        """距上次备份超过间隔后在后台备份"""
+        if not self.backup_running and self.backup_manager.is_due():
+            self.start_backup(self.on_backup_finished)
+
+    def backup_now(self):
+        """立即在后台备份"""
+        if self.backup_running:
+            self.status_bar.showMessage("正在备份数据库，请稍候...", 3000)
+            return
+        self.start_backup(self.on_backup_finished)
+
+    def start_backup(self, on_finished):
+        """在后台线程创建备份，进度显示在状态栏"""
+        self.backup_running = True
+        # 先写入延迟队列中的账目，使其包含在备份中
+        self.db_manager.flush()
+        self.status_bar.showMessage("正在备份数据库...")
+        run_in_background(self.backup_manager.create_backup,
+                          progress=lambda remaining, total: self.backup_progress.emit(remaining, total),
+                          on_finished=on_finished, on_error=on_finished)
+
+    def on_backup_progress(self, remaining, total):
+        """显示备份进度"""
+        if total:
+            suffix = "，完成后自动退出" if self.exit_backup_state == 'running' else ""
+            self.status_bar.showMessage(
+                f"正在备份数据库 {(total - remaining) * 100 // total}%{suffix}...")
+
+    def on_backup_finished(self, result):
+        """备份结束（成功时为备份路径，失败时为 None 或错误信息）"""
+        self.backup_running = False
+        if result and not isinstance(result, str):
+            self.status_bar.showMessage(f"数据库已备份到 {result}", 5000)
+        else:
+            self.status_bar.showMessage("数据库备份失败", 5000)
+            print(f"数据库备份失败: {result}")
+
+    def restore_from_backup(self):
+        """选择备份文件并在后台恢复"""
+        path, _ = QFileDialog.getOpenFileName(
+            self, '从备份恢复', str(self.backup_manager.backup_dir),
+            '数据库备份 (*.db *.db.gz *.db.bz2 *.db.xz)')
+        if not path:
+            return
+        answer = QMessageBox.question(
+            self, '从备份恢复', f"当前数据将被备份中的数据替换，确定要从以下备份恢复吗？\n{path}")
+        if answer != QMessageBox.StandardButton.Yes:
+            return
+
+        # 先写入延迟队列中的账目，避免恢复后再写入旧数据
+        self.db_manager.flush()
+        self.status_bar.showMessage("正在从备份恢复...")
+        run_in_background(self.backup_manager.restore_backup, path,
+                          on_finished=self.on_restore_finished,
+                          on_error=lambda message: self.on_restore_finished(False))
+
+    def on_restore_finished(self, restored):
+        """恢复结束后刷新当前页面"""
+        if restored:
+            self.switch_page(self.current_page)
+            self.status_bar.showMessage("已从备份恢复", 5000)
+        else:
+            QMessageBox.warning(self, '恢复失败', '无法从该备份恢复，当前数据未修改')
+
+    def start_exit_backup(self):
+        """退出前在后台备份数据库，完成后再关闭窗口，期间界面保持响应"""
+        self.exit_backup_state = 'running'
+        self.maintenance_timer.stop()
+        self.backup_timer.stop()
+        self.centralWidget().setEnabled(False)
+        self.menuBar().setEnabled(False)
+        self.start_backup(self.on_exit_backup_finished)
+
+    def on_exit_backup_finished(self, result):
+        """退出备份结束（成功时为备份路径，失败时为 None 或错误信息），继续关闭窗口"""
+        self.backup_running = False
+        if not result or isinstance(result, str):
+            print(f"退出时备份失败: {result}")
+        self.exit_backup_state = 'done'
+        self.close()
+
     def closeEvent(self, event):
         """窗口关闭事件"""
         try:
             if self.db_manager:
+                if DB_CONFIG.get('backup_on_exit') and self.exit_backup_state != 'done':
+                    # 备份在后台进行，结束后再次关闭窗口
+                    if self.exit_backup_state is None:
+                        self.start_exit_backup()
+                    event.ignore()
+                    return
+
+                # 等待后台查询、维护和备份任务结束
+                self.maintenance_timer.stop()
+                self.backup_timer.stop()
+                QThreadPool.globalInstance().waitForDone()
+                # 先写入延迟队列中的账目，避免退出时丢失
+                self.db_manager.flush()
                 self.db_manager.close()
             event.accept()
         except Exception as e:
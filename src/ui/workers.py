@@ -0,0 +1,41 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from ..database.pool import ConnectionPool
+
+class DatabaseTaskSignals(QObject):
+    """后台任务信号"""
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+class DatabaseTask(QRunnable):
+    """在线程池中执行数据库查询，结果通过信号回到GUI线程
+
+    DatabaseManager 会为工作线程分配独立的只读连接，
+    写操作则通过连接池的写锁串行执行。
+    线程池会回收空闲线程，因此每个任务结束时关闭本线程的只读连接。
+    """
+    def __init__(self, func, *args, **kwargs):
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = DatabaseTaskSignals()
+
+    def run(self):
+        try:
+            result = self.func(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+        finally:
+            ConnectionPool.release_current_thread()
+
+def run_in_background(func, *args, on_finished=None, on_error=None, **kwargs) -> DatabaseTask:
+    """提交后台任务到全局线程池"""
+    task = DatabaseTask(func, *args, **kwargs)
+    if on_finished is not None:
+        task.signals.finished.connect(on_finished)
+    if on_error is not None:
+        task.signals.error.connect(on_error)
+    QThreadPool.globalInstance().start(task)
+    return task
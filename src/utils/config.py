@@ -33,6 +33,41 @@ APP_CONFIG = {
 DB_CONFIG = {
     'database_path': str(DATABASE_PATH),
     'backup_count': 10,
+    'backup_dir': str(USER_DATA_DIR / 'backups'),
+    'backup_compression': 'gzip',     # 备份压缩格式：gzip/bz2/xz，None 表示不压缩
+    'backup_pages_per_step': 256,     # 在线备份每一步复制的页数
+    'backup_on_exit': False,          # 退出程序时在后台备份，完成后再关闭窗口
+    'backup_interval_hours': 24,      # 自动备份的间隔，程序运行期间在后台执行，0 表示不自动备份
+    'maintenance_interval_hours': 24,   # 例行维护的间隔，0 表示不自动维护
+    'maintenance_idle_delay_ms': 60000, # 程序启动后等待多久再检查是否需要维护
+    'maintenance_vacuum_pages': 1000,   # 增量回收每批的页数
+    'maintenance_time_budget_ms': 2000, # 单次增量回收的时间上限
+    'fetch_batch_size': 1000,  # 流式查询每次从游标读取的行数
+    'query_cache_size': 128,   # 查询结果缓存条数，0 表示不缓存
+    'query_cache_max_rows': 50000,        # 查询结果缓存的总行数上限
+    'query_cache_max_result_rows': 5000,  # 超过该行数的查询结果不缓存
+    'query_profiling': True,   # 统计每条语句的耗时和行数
+    'slow_query_ms': 100,      # 超过该耗时的语句输出查询计划，None 表示不输出
+    'write_behind': False,            # 界面录入的账目是否延迟批量写入
+    'write_behind_interval_ms': 500,  # 延迟写入的最长等待时间
+    'write_behind_max_rows': 50,      # 积累多少条后立即写入
+    # 连接参数，每次打开连接时应用
+    'pragmas': {
+        # 必须在切换WAL之前设置，新建的数据库才会以增量回收模式创建；对已有数据库无影响
+        'auto_vacuum': 'INCREMENTAL',
+        'journal_mode': 'WAL',        # 读写互不阻塞
+        'synchronous': 'NORMAL',      # WAL模式下只在检查点时同步，断电不会损坏数据库
+        'cache_size': -16000,         # 负数单位为KB，约16MB页缓存
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,         # 毫秒，数据库被锁定时的等待时间
+    },
+    # 批量导入时临时使用的连接参数，导入结束后恢复
+    'bulk_import_pragmas': {
+        'synchronous': 'OFF',         # 导入期间断电可能丢失数据，仅限临时使用
+        'cache_size': -131072,        # 约128MB页缓存
+        'temp_store': 'MEMORY',
+    },
 }
 
 # UI配置
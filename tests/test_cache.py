@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+查询结果缓存测试
+
+运行：python -m pytest tests 或 python -m unittest discover tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.database.cache import QueryCache
+
+class QueryCacheTest(unittest.TestCase):
+    def _put(self, cache: QueryCache, key: str, rows: int):
+        cache.put(key, cache.generations(('items',)), [{'id': i} for i in range(rows)])
+
+    def test_large_results_are_not_cached(self):
+        """超过 max_result_rows 行的结果不缓存"""
+        cache = QueryCache(max_entries=10, max_rows=1000, max_result_rows=100)
+        self._put(cache, 'small', 100)
+        self._put(cache, 'large', 101)
+        self.assertTrue(cache.get('small', ('items',))[0])
+        self.assertFalse(cache.get('large', ('items',))[0])
+
+    def test_total_rows_are_limited(self):
+        """总行数超过 max_rows 时淘汰最久未使用的缓存项"""
+        cache = QueryCache(max_entries=10, max_rows=250, max_result_rows=100)
+        for key in ('a', 'b'):
+            self._put(cache, key, 100)
+        cache.get('a', ('items',))
+        self._put(cache, 'c', 100)
+        self.assertEqual(cache.stats()['rows'], 200)
+        self.assertTrue(cache.get('a', ('items',))[0])
+        self.assertFalse(cache.get('b', ('items',))[0])
+        self.assertTrue(cache.get('c', ('items',))[0])
+
+    def test_row_count_follows_invalidation(self):
+        """失效和清空缓存后行数同步减少"""
+        cache = QueryCache(max_entries=10, max_rows=1000, max_result_rows=100)
+        self._put(cache, 'a', 50)
+        self._put(cache, 'a', 60)
+        self.assertEqual(cache.stats()['rows'], 60)
+        cache.invalidate(('items',))
+        self.assertFalse(cache.get('a', ('items',))[0])
+        self.assertEqual(cache.stats()['rows'], 0)
+        self._put(cache, 'b', 10)
+        cache.invalidate()
+        self.assertEqual(cache.stats()['rows'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
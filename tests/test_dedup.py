@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+账目指纹测试
+
+运行：python -m pytest tests 或 python -m unittest discover tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.database.dedup import FingerprintSequencer
+
+class FingerprintSequencerTest(unittest.TestCase):
+    def test_repeated_transactions_get_distinct_fingerprints(self):
+        """同一天相同的两笔交易得到不同的指纹"""
+        sequencer = FingerprintSequencer('bank')
+        first = sequencer.fingerprint('2024-01-01', 'expense', 4.0, '地铁')
+        second = sequencer.fingerprint('2024-01-01', 'expense', 4.0, '地铁')
+        self.assertNotEqual(first, second)
+
+    def test_non_adjacent_same_day_rows(self):
+        """同一天的交易被其他日期隔开时，编号继续递增而不是从头开始"""
+        sequencer = FingerprintSequencer('bank')
+        fingerprints = [
+            sequencer.fingerprint('2024-01-01', 'expense', 4.0, '地铁'),
+            sequencer.fingerprint('2024-01-02', 'expense', 4.0, '地铁'),
+            sequencer.fingerprint('2024-01-01', 'expense', 4.0, '地铁'),
+        ]
+        self.assertEqual(len(set(fingerprints)), 3)
+
+    def test_reimport_gives_same_fingerprints(self):
+        """重新导入同一文件时指纹不变"""
+        rows = [('2024-01-01', 'expense', 4.0, '地铁'), ('2024-01-02', 'income', 100.0, '工资'),
+                ('2024-01-01', 'expense', 4.0, '地铁')]
+        imports = []
+        for _ in range(2):
+            sequencer = FingerprintSequencer('bank')
+            imports.append([sequencer.fingerprint(*row) for row in rows])
+        self.assertEqual(imports[0], imports[1])
+
+if __name__ == '__main__':
+    unittest.main()
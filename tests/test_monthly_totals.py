@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+按月分类汇总表（monthly_category_totals）测试
+
+运行：python -m pytest tests 或 python -m unittest discover tests
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config import DB_CONFIG
+from src.database.database import DatabaseManager
+
+class MonthlyTotalsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self._database_path = DB_CONFIG['database_path']
+        DB_CONFIG['database_path'] = os.path.join(self.tmp_dir, 'test.db')
+        self.db = DatabaseManager()
+        categories, _ = self.db.category_maps()
+        self.categories = {
+            account_type: [category_id for category_id, category in categories.items()
+                           if category['type'] == account_type]
+            for account_type in ('income', 'expense')
+        }
+        self.random = random.Random(42)
+
+    def tearDown(self):
+        self.db.close()
+        DB_CONFIG['database_path'] = self._database_path
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _random_account(self) -> tuple:
+        account_type = self.random.choice(('income', 'expense'))
+        return (account_type, round(self.random.uniform(1, 500), 2),
+                self.random.choice(self.categories[account_type]), '测试',
+                f"2024-{self.random.randint(1, 4):02d}-{self.random.randint(1, 28):02d}")
+
+    def _rollup(self) -> dict:
+        rows = self.db.execute_query(
+            "SELECT month, category_id, type, total, count FROM monthly_category_totals")
+        return {(row['month'], row['category_id'], row['type']): (round(row['total'], 2), row['count'])
+                for row in rows}
+
+    def _aggregate(self) -> dict:
+        rows = self.db.execute_query('''
+            SELECT substr(date, 1, 7) AS month, category_id, type, SUM(amount) AS total, COUNT(*) AS count
+            FROM accounts
+            GROUP BY substr(date, 1, 7), category_id, type
+        ''')
+        return {(row['month'], row['category_id'], row['type']): (round(row['total'], 2), row['count'])
+                for row in rows}
+
+    def test_rollup_matches_accounts_after_random_changes(self):
+        """随机新增、修改和删除后，汇总表与账目表的聚合结果一致，且不保留空行"""
+        self.db.add_accounts_bulk([self._random_account() for _ in range(200)])
+        ids = [row['id'] for row in self.db.execute_query("SELECT id FROM accounts")]
+
+        for account_id in self.random.sample(ids, 60):
+            account_type, amount, category_id, _, date = self._random_account()
+            updates = self.random.choice([
+                {'amount': amount},
+                {'date': date},
+                {'type': account_type, 'category_id': category_id},
+                {'type': account_type, 'category_id': category_id, 'amount': amount, 'date': date},
+            ])
+            self.db.update_account(account_id, updates)
+        for account_id in self.random.sample(ids, 80):
+            self.db.delete_account(account_id)
+        self.db.add_account(*self._random_account())
+
+        self.assertEqual(self._rollup(), self._aggregate())
+        self.assertFalse(self.db.execute_query(
+            "SELECT 1 FROM monthly_category_totals WHERE count <= 0"))
+
+    def test_rollback_restores_rollup(self):
+        """事务回滚时汇总表一同回滚"""
+        self.db.add_accounts_bulk([self._random_account() for _ in range(20)])
+        before = self._rollup()
+        try:
+            with self.db.transaction():
+                self.db.add_account(*self._random_account())
+                self.db.execute_update("DELETE FROM accounts WHERE id IN (SELECT id FROM accounts LIMIT 5)")
+                raise RuntimeError('回滚')
+        except RuntimeError:
+            pass
+        self.assertEqual(self._rollup(), before)
+
+    def test_summary_of_whole_months_matches_accounts(self):
+        """整月范围的汇总（读取汇总表）与按日期范围计算的结果一致"""
+        self.db.add_accounts_bulk([self._random_account() for _ in range(100)])
+        summary = {row['type']: (round(row['total'], 2), row['count'])
+                   for row in self.db.get_account_summary('2024-01-01', '2024-04-30')}
+        rows = self.db.execute_query('''
+            SELECT type, SUM(amount) AS total, COUNT(*) AS count
+            FROM accounts WHERE date BETWEEN '2024-01-01' AND '2024-04-30' GROUP BY type
+        ''')
+        self.assertEqual(summary, {row['type']: (round(row['total'], 2), row['count']) for row in rows})
+
+if __name__ == '__main__':
+    unittest.main()
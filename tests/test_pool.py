@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+连接池测试
+
+运行：python -m pytest tests 或 python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config import DB_CONFIG
+from src.database.database import DatabaseManager
+from src.database.pool import ConnectionPool
+
+class ConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self._database_path = DB_CONFIG['database_path']
+        DB_CONFIG['database_path'] = os.path.join(self.tmp_dir, 'test.db')
+        self.db = DatabaseManager()
+
+    def tearDown(self):
+        self.db.close()
+        DB_CONFIG['database_path'] = self._database_path
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _run_in_thread(self, target):
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+
+    def test_readers_of_finished_threads_are_closed(self):
+        """线程结束后，其只读连接在下次打开连接时关闭"""
+        for _ in range(20):
+            self._run_in_thread(self.db.get_accounts)
+        self.db.get_accounts()
+        # 当前线程的连接，以及最后一个线程结束后尚未清理的连接
+        self.assertLessEqual(len(self.db.pool._readers), 2)
+
+    def test_release_current_thread(self):
+        """release_current_thread() 关闭当前线程的只读连接"""
+        def task():
+            self.db.get_accounts()
+            ConnectionPool.release_current_thread()
+
+        before = set(self.db.pool._readers)
+        self._run_in_thread(task)
+        self.assertEqual(set(self.db.pool._readers), before)
+
+if __name__ == '__main__':
+    unittest.main()
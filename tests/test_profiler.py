@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+查询耗时统计测试
+
+运行：python -m pytest tests 或 python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config import DB_CONFIG
+from src.database.database import DatabaseManager
+
+class QueryProfilerTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self._database_path = DB_CONFIG['database_path']
+        DB_CONFIG['database_path'] = os.path.join(self.tmp_dir, 'test.db')
+        self.db = DatabaseManager()
+        categories, _ = self.db.category_maps()
+        self.category_id = next(category_id for category_id, category in categories.items()
+                                if category['type'] == 'expense')
+        self.db.profiler.reset()
+
+    def tearDown(self):
+        self.db.close()
+        DB_CONFIG['database_path'] = self._database_path
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def test_writes_are_recorded_under_calling_method(self):
+        """单条写入、批量写入和库存变动都按调用它们的方法统计"""
+        self.db.add_account('expense', 10, self.category_id, 'a', '2024-01-01')
+        self.db.add_accounts_bulk([('expense', 10, self.category_id, 'b', '2024-01-01')] * 20)
+        item_id = self.db.add_item('物品', None, 0, '个', 1, 0, '')
+        self.db.add_inventory_transaction(item_id, 'in', 5, 1, '采购', '2024-01-01')
+
+        stats = self.db.profiler.stats()
+        self.assertEqual(stats['DatabaseManager.add_account']['rows'], 1)
+        self.assertEqual(stats['DatabaseManager.add_accounts_bulk']['rows'], 20)
+        self.assertEqual(stats['DatabaseManager.add_inventory_transaction']['count'], 1)
+
+    def test_transaction_commit_is_recorded_under_caller(self):
+        """事务提交的耗时计入开启事务的方法"""
+        with self.db.transaction():
+            self.db.add_account('expense', 10, self.category_id, 'a', '2024-01-01')
+
+        stats = self.db.profiler.stats()
+        self.assertEqual(stats['QueryProfilerTest.test_transaction_commit_is_recorded_under_caller']['count'], 1)
+        self.assertNotIn('DatabaseManager.transaction', stats)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+事务与嵌套保存点测试
+
+运行：python -m pytest tests 或 python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config import DB_CONFIG
+from src.database.database import DatabaseManager
+
+class TransactionTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self._database_path = DB_CONFIG['database_path']
+        DB_CONFIG['database_path'] = os.path.join(self.tmp_dir, 'test.db')
+        self.db = DatabaseManager()
+        categories, _ = self.db.category_maps()
+        self.category_id = next(category_id for category_id, category in categories.items()
+                                if category['type'] == 'expense')
+
+    def tearDown(self):
+        self.db.close()
+        DB_CONFIG['database_path'] = self._database_path
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _add(self, description: str) -> int:
+        return self.db.add_account('expense', 10, self.category_id, description, '2024-01-01')
+
+    def _descriptions(self) -> list:
+        rows = self.db.execute_query("SELECT description FROM accounts ORDER BY id")
+        return [row['description'] for row in rows]
+
+    def test_commit(self):
+        """事务块正常结束时提交全部修改"""
+        with self.db.transaction():
+            self._add('a')
+            self._add('b')
+        self.assertEqual(self._descriptions(), ['a', 'b'])
+        self.assertFalse(self.db.in_transaction())
+
+    def test_rollback(self):
+        """事务块抛出异常时回滚全部修改"""
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self._add('a')
+                raise RuntimeError('回滚')
+        self.assertEqual(self._descriptions(), [])
+        self.assertFalse(self.db.in_transaction())
+
+    def test_inner_rollback_keeps_outer_writes(self):
+        """内层回滚只撤销内层的修改，外层的修改照常提交"""
+        with self.db.transaction():
+            self._add('outer')
+            try:
+                with self.db.transaction():
+                    self._add('inner')
+                    raise RuntimeError('回滚内层')
+            except RuntimeError:
+                pass
+            self._add('after')
+        self.assertEqual(self._descriptions(), ['outer', 'after'])
+
+    def test_outer_rollback_discards_released_savepoint(self):
+        """内层已释放的修改随外层回滚一起撤销"""
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                with self.db.transaction():
+                    self._add('inner')
+                raise RuntimeError('回滚外层')
+        self.assertEqual(self._descriptions(), [])
+
+    def test_failed_write_raises_inside_transaction(self):
+        """事务块内写入失败时抛出异常而不是返回0"""
+        with self.assertRaises(Exception):
+            with self.db.transaction():
+                self._add('a')
+                self.db.add_account('expense', -1, self.category_id, 'bad', '2024-01-01')
+        self.assertEqual(self._descriptions(), [])
+
+    def test_reads_inside_transaction_see_own_writes(self):
+        """事务块内可以读到本事务尚未提交的修改，其他线程读不到"""
+        seen = []
+        with self.db.transaction():
+            self._add('a')
+            seen.append(len(self.db.get_accounts()))
+            thread = threading.Thread(target=lambda: seen.append(len(self.db.get_accounts())))
+            thread.start()
+            thread.join()
+        self.assertEqual(seen, [1, 0])
+
+if __name__ == '__main__':
+    unittest.main()
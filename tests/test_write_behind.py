@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+延迟写入队列的多线程测试
+
+运行：python -m pytest tests 或 python -m unittest discover tests
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+project_root = Path(__file__).parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from src.utils.config import DB_CONFIG
+from src.database.database import DatabaseManager
+
+# 线程超过该时间（秒）仍未结束视为死锁
+TIMEOUT = 10
+
+class WriteBehindThreadingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self._database_path = DB_CONFIG['database_path']
+        DB_CONFIG['database_path'] = os.path.join(self.tmp_dir, 'test.db')
+        self.db = DatabaseManager()
+        # 定时器间隔足够长，由测试控制写入时机
+        self.db.enable_write_behind(flush_interval_ms=60000, max_rows=1000)
+        categories, _ = self.db.category_maps()
+        self.category_id = next(category_id for category_id, category in categories.items()
+                                if category['type'] == 'expense')
+
+    def tearDown(self):
+        self.db.close()
+        DB_CONFIG['database_path'] = self._database_path
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _start(self, target) -> threading.Thread:
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def _join(self, *threads: threading.Thread):
+        for thread in threads:
+            thread.join(TIMEOUT)
+            self.assertFalse(thread.is_alive(), "线程未结束，可能发生死锁")
+
+    def _account_count(self) -> int:
+        return self.db.execute_query("SELECT COUNT(*) FROM accounts")[0][0]
+
+    def test_read_inside_transaction_while_timer_flushes(self):
+        """定时写入等待写锁时，持有写锁的线程读取数据不会死锁"""
+        in_transaction = threading.Event()
+        read = threading.Event()
+
+        def importer():
+            try:
+                with self.db.transaction():
+                    self.db.add_accounts_bulk([('expense', 10, self.category_id, '导入', '2024-01-01')])
+                    in_transaction.set()
+                    read.wait(TIMEOUT)
+                    # 读取会先尝试写入延迟队列
+                    self.db.find_account_fingerprints(['missing'])
+                    self.db.get_accounts()
+                    raise RuntimeError('回滚导入')
+            except RuntimeError:
+                pass
+
+        import_thread = self._start(importer)
+        self.assertTrue(in_transaction.wait(TIMEOUT))
+
+        first_id = self.db.add_account('expense', 20, self.category_id, '界面录入1', '2024-01-02')
+        flush_thread = self._start(self.db.write_behind.flush)
+        # 等待写入线程取出队列并阻塞在写锁上，再录入一条
+        time.sleep(0.2)
+        second_id = self.db.add_account('expense', 30, self.category_id, '界面录入2', '2024-01-03')
+        read.set()
+        self._join(import_thread, flush_thread)
+
+        self.db.flush()
+        ids = [self.db.write_behind.resolve_id(first_id), self.db.write_behind.resolve_id(second_id)]
+        rows = self.db.execute_query("SELECT id, description FROM accounts ORDER BY id")
+        self.assertEqual([(row['id'], row['description']) for row in rows],
+                         [(ids[0], '界面录入1'), (ids[1], '界面录入2')])
+
+    def test_rollback_does_not_drop_queued_accounts(self):
+        """事务内读取不会把队列中的账目写入该事务，事务回滚后它们仍会写入"""
+        def importer():
+            try:
+                with self.db.transaction():
+                    self.db.add_accounts_bulk([('expense', 10, self.category_id, '导入', '2024-01-01')])
+                    self.db.get_accounts()
+                    raise RuntimeError('回滚导入')
+            except RuntimeError:
+                pass
+
+        provisional_id = self.db.add_account('expense', 20, self.category_id, '界面录入', '2024-01-02')
+        self._join(self._start(importer))
+
+        self.assertEqual(self.db.flush(), 1)
+        account_id = self.db.write_behind.resolve_id(provisional_id)
+        rows = self.db.execute_query("SELECT id, description FROM accounts")
+        self.assertEqual([(row['id'], row['description']) for row in rows], [(account_id, '界面录入')])
+
+    def test_read_does_not_wait_for_other_writer(self):
+        """其他线程持有写锁时，读取不等待写入延迟队列"""
+        in_transaction = threading.Event()
+        release = threading.Event()
+
+        def importer():
+            with self.db.transaction():
+                self.db.add_accounts_bulk([('expense', 10, self.category_id, '导入', '2024-01-01')])
+                in_transaction.set()
+                release.wait(TIMEOUT)
+
+        import_thread = self._start(importer)
+        self.assertTrue(in_transaction.wait(TIMEOUT))
+        try:
+            self.db.add_account('expense', 20, self.category_id, '界面录入', '2024-01-02')
+            start = time.perf_counter()
+            # 只能看到已提交的数据：导入尚未提交，队列中的账目也未写入
+            self.assertEqual(self._account_count(), 0)
+            self.assertLess(time.perf_counter() - start, 1)
+            self.assertEqual(self.db.write_behind.pending, 1)
+        finally:
+            release.set()
+        self._join(import_thread)
+
+        self.assertEqual(self._account_count(), 2)
+        self.assertEqual(self.db.write_behind.pending, 0)
+
+if __name__ == '__main__':
+    unittest.main()